@@ -6,8 +6,10 @@ from auth.helpers.exceptions import (
     InvalidEmailError,
     InvalidPasswordError,
     SignInError,
+    AuthServiceBusyError,
 )
 from auth.models.storage import save_existed_users
+from auth.services import auth_service
 from config.log_config import config_logging
 
 logger = config_logging()
@@ -39,8 +41,7 @@ def handle_sign_in() -> User:
         print(show_divider())
 
         try:
-            user = User(username, email, password)
-            user = user.sign_in()
+            user = auth_service.sign_in(username, email, password)
 
             clear_screen()
             print("Great! You are signed in. Enjoy your shopping experience.")
@@ -55,6 +56,10 @@ def handle_sign_in() -> User:
             clear_screen()
             logger.info(error)
             print("We're sorry, but the account information you provided is invalid. Please double-check your credentials and try again.")
+        except AuthServiceBusyError as error:
+            clear_screen()
+            logger.warning(error)
+            print(error)
         except Exception as error:
             clear_screen()
             logger.critical(error)
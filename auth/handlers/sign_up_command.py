@@ -1,5 +1,4 @@
 from getpass import getpass
-from pathlib import Path
 from auth.utils.funcs import clear_screen, show_divider
 from auth.models.user import User
 from auth.helpers.exceptions import (
@@ -8,8 +7,10 @@ from auth.helpers.exceptions import (
     InvalidUsernameError,
     DuplicateEmailError,
     DuplicateUsernameError,
+    AuthServiceBusyError,
 )
 from auth.models.storage import save_existed_users
+from auth.services import auth_service
 from config.log_config import config_logging
 
 logger = config_logging()
@@ -41,9 +42,7 @@ def handle_sign_up() -> User:
         print(show_divider())
 
         try:
-            user = User(username, email, password)
-            user.check_duplicate()
-            user.add_user()
+            user = auth_service.sign_up(username, email, password)
 
             clear_screen()
             logger.info(f"{user} signed up.")
@@ -61,6 +60,10 @@ def handle_sign_up() -> User:
             clear_screen()
             logger.error(error)
             print("Sorry, the provided information is invalid or already exists. Please try again.")
+        except AuthServiceBusyError as error:
+            clear_screen()
+            logger.warning(error)
+            print(error)
         except Exception as error:
             clear_screen()
             logger.critical(error)
@@ -68,11 +71,4 @@ def handle_sign_up() -> User:
 
         print(show_divider())
 
-    # Write in users json file.
-    directory = Path.cwd()
-    file_path = directory / "auth/models/users.json"
-
-    with file_path.open("w") as users_file:
-        User.to_json(structure={"users": User.all_dict}, json_file=users_file)
-
     return user
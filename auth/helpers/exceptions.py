@@ -30,4 +30,14 @@ class DuplicateEmailError(Exception):
 
 class SignInError(Exception):
     """Raised when an error occurs during the sign-in process."""
-    pass
\ No newline at end of file
+    pass
+
+
+class AuthServiceBusyError(Exception):
+    """Raised when too many authentication requests are already waiting to be processed."""
+    pass
+
+
+class UsersFileError(Exception):
+    """Raised when the users file can't be read or is corrupted."""
+    pass
@@ -0,0 +1,96 @@
+from typing import Dict, Iterator, List, NoReturn, Optional, TYPE_CHECKING
+from config.log_config import config_logging
+
+if TYPE_CHECKING:
+    from auth.models.user import User
+
+logger = config_logging()
+
+
+class UserRegistry:
+    """
+    Keeps every known user indexed by username and by email.
+
+    Both keys are stored lowercased, so duplicate checks and sign-in lookups
+    are single dictionary accesses instead of scans over all users. The
+    username index preserves insertion order, which keeps the JSON output stable.
+
+    Attributes:
+        by_username (Dict[str, User]): Users keyed by their lowercased username.
+        by_email (Dict[str, User]): Users keyed by their lowercased email address.
+    """
+
+    def __init__(self) -> NoReturn:
+        """Initializes an empty registry."""
+        self.by_username: Dict[str, "User"] = dict()
+        self.by_email: Dict[str, "User"] = dict()
+
+    def register(self, user: "User") -> NoReturn:
+        """
+        Add the user to the registry, replacing any stale record with the same username.
+
+        Args:
+            user (User): The user to be registered.
+        """
+        username = user.username.lower()
+        previous = self.by_username.get(username)
+        if previous is not None:
+            self.by_email.pop(previous.email.lower(), None)
+            logger.debug(f"{previous} has been replaced in the user registry.")
+
+        self.by_username[username] = user
+        self.by_email[user.email.lower()] = user
+
+    def get_by_username(self, username: str) -> Optional["User"]:
+        """
+        Get the user registered with the given username.
+
+        Args:
+            username (str): The username to look up.
+
+        Returns:
+            Optional[User]: The matching user, or None if nobody uses that username.
+        """
+        return self.by_username.get(username.lower())
+
+    def get_by_email(self, email: str) -> Optional["User"]:
+        """
+        Get the user registered with the given email address.
+
+        Args:
+            email (str): The email address to look up.
+
+        Returns:
+            Optional[User]: The matching user, or None if nobody uses that email address.
+        """
+        return self.by_email.get(email.lower())
+
+    def has_username(self, username: str) -> bool:
+        """Return True if the username is already registered."""
+        return username.lower() in self.by_username
+
+    def has_email(self, email: str) -> bool:
+        """Return True if the email address is already registered."""
+        return email.lower() in self.by_email
+
+    def to_dicts(self) -> List[dict]:
+        """
+        Get the attributes of all registered users, ready to be written to the users file.
+
+        Returns:
+            List[dict]: A list of dictionaries representing the attributes of all users.
+        """
+        return [user.__dict__ for user in self.by_username.values()]
+
+    def clear(self) -> NoReturn:
+        """Remove every user from the registry."""
+        self.by_username.clear()
+        self.by_email.clear()
+
+    def __iter__(self) -> Iterator["User"]:
+        """Iterate over the registered users in insertion order."""
+        return iter(self.by_username.values())
+
+    def __len__(self) -> int:
+        """Return the number of registered users."""
+        return len(self.by_username)
@@ -1,31 +1,551 @@
+import atexit
 import json
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import NoReturn
+from typing import List, NoReturn, Optional, Tuple
+from auth.models.registry import UserRegistry
 from auth.models.user import User
+from auth.helpers.exceptions import UsersFileError
+from config.app_config import get_config, project_path
+from config.database import connect_sqlite
+from config.helpers.exceptions import ConfigFileError
 from config.log_config import config_logging
 
 logger = config_logging()
 
-directory = Path.cwd()
-file_path = directory / "auth/models/users.json"
+file_path = project_path("auth/models/users.json")
+journal_path = project_path("auth/models/users.journal.jsonl")
 
-try:
-    with file_path.open(mode="r") as users_file:
-        data = json.load(users_file)
-        users = data.get("users", [])
-except:
-    logger.critical("Something went wrong in users file opening.")
-    users = list()
+storage_config = get_config("auth.storage")
 
+# Number of journal appends that are written before the journal is fsynced.
+FSYNC_BATCH_SIZE = 16
+# Journal size in bytes after which it is compacted into the snapshot.
+COMPACTION_THRESHOLD = 1024 * 1024
 
-def save_existed_users() -> NoReturn:
-    """Saves existing users from a JSON file to the system."""
-    for user in users:
-        username, email, password, is_premium = (
-            user["_username"],
-            user["_email"],
-            user["_hashed_password"],
-            user["is_premium"],
+
+def _file_generation(path: Path) -> Optional[Tuple[int, int]]:
+    """Return the (mtime_ns, size) of the file, or None if it can't be read."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _rotated_path(path: Path) -> Path:
+    """Return the path a journal is moved to while it is being compacted."""
+    return path.with_name(path.name + ".compacting")
+
+
+def _user_from_record(record: dict) -> User:
+    """Build a User from a record of the users file."""
+    username, email, password, is_premium = (
+        record["_username"],
+        record["_email"],
+        record["_hashed_password"],
+        record["is_premium"],
+    )
+    return User(username, email, password, is_premium, is_hashed=True)
+
+
+class UserStore(ABC):
+    """Interface of the persistent storages users are signed up to and signed in from."""
+
+    @abstractmethod
+    def load(self) -> NoReturn:
+        """Make the stored users available. Must be cheap to call again."""
+
+    @abstractmethod
+    def has_username(self, username: str) -> bool:
+        """Return True if the username is already in use."""
+
+    @abstractmethod
+    def has_email(self, email: str) -> bool:
+        """Return True if the email address is already in use."""
+
+    @abstractmethod
+    def get_by_username(self, username: str) -> Optional[User]:
+        """Return the user with the given username, or None if there is none."""
+
+    @abstractmethod
+    def add(self, user: User) -> NoReturn:
+        """Persist a newly signed-up user."""
+
+    @abstractmethod
+    def update_password(self, user: User) -> NoReturn:
+        """Persist the rehashed password of an existing user."""
+
+    def close(self) -> NoReturn:
+        """Release the resources held by the store."""
+
+
+class UsersJournal:
+    """
+    Append-only log of signed-up users, compacted into the users snapshot in the background.
+
+    Every sign-up appends a single JSON line instead of rewriting the whole
+    users file. Appends are flushed immediately and fsynced in batches. When
+    the journal grows past the compaction threshold, it is rotated and a
+    background thread writes the full registry into the snapshot file. At
+    most one compaction runs at a time.
+
+    Attributes:
+        path (Path): The JSONL journal file.
+        snapshot_path (Path): The users JSON snapshot file.
+        registry (UserRegistry): The users written to the snapshot on compaction.
+        fsync_batch_size (int): Number of appends between two fsyncs.
+        compaction_threshold (int): Journal size in bytes that triggers a compaction.
+        lock (threading.Lock): Guards the journal file and the registry, which are changed together.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        snapshot_path: Path,
+        registry: UserRegistry,
+        fsync_batch_size: int = FSYNC_BATCH_SIZE,
+        compaction_threshold: int = COMPACTION_THRESHOLD,
+    ) -> NoReturn:
+        """
+        Initializes a journal for the given snapshot.
+
+        Args:
+            path (Path): The JSONL journal file.
+            snapshot_path (Path): The users JSON snapshot file.
+            registry (UserRegistry): The users written to the snapshot on compaction.
+            fsync_batch_size (int, optional): Number of appends between two fsyncs. Defaults to FSYNC_BATCH_SIZE.
+            compaction_threshold (int, optional): Journal size in bytes that triggers a compaction. Defaults to COMPACTION_THRESHOLD.
+        """
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.registry = registry
+        self.fsync_batch_size = fsync_batch_size
+        self.compaction_threshold = compaction_threshold
+
+        self._file = None
+        self._unsynced = 0
+        self.lock = threading.Lock()
+        self._compaction: Optional[threading.Thread] = None
+        # Held for the whole of a compaction, so compactions never overlap.
+        self._compaction_lock = threading.Lock()
+
+    def append(self, user: User) -> NoReturn:
+        """
+        Register a user and append its record to the journal.
+
+        Both happen under the lock, so a compaction copies the registry either
+        before or after the user has been both registered and journaled.
+
+        Args:
+            user (User): The newly signed-up or updated user.
+        """
+        line = json.dumps(user.__dict__, sort_keys=True) + "\n"
+
+        with self.lock:
+            self.registry.register(user)
+            if self._file is None:
+                self._file = self.path.open("a")
+            self._file.write(line)
+            self._file.flush()
+
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch_size:
+                self._sync()
+
+            should_compact = self._file.tell() >= self.compaction_threshold
+
+        if should_compact:
+            self.compact_in_background()
+
+    def sync(self) -> NoReturn:
+        """Fsync every pending append."""
+        with self.lock:
+            self._sync()
+
+    def _sync(self) -> NoReturn:
+        """Fsync pending appends. The caller must hold the lock."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self) -> NoReturn:
+        """Fsync pending appends and close the journal file."""
+        with self.lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def compact_in_background(self) -> NoReturn:
+        """Start a compaction thread unless one is already running."""
+        with self.lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+
+            self._compaction = threading.Thread(
+                target=self.compact, name="users-journal-compaction", daemon=True
+            )
+            self._compaction.start()
+
+    def compact(self) -> NoReturn:
+        """
+        Fold the journal into the snapshot.
+
+        The journal is rotated and the registry copied while holding the lock,
+        so new sign-ups keep appending to a fresh journal while the snapshot is
+        being written. A journal left rotated by an interrupted compaction is
+        kept, with the current one appended to it. The snapshot is written to
+        a temporary file of its own and moved into place, and the rotated
+        journal is only removed once the new snapshot is in place.
+        """
+        rotated = _rotated_path(self.path)
+
+        with self._compaction_lock:
+            with self.lock:
+                self._sync()
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                if self.path.exists():
+                    if rotated.exists():
+                        with rotated.open("a") as rotated_file, self.path.open() as journal_file:
+                            rotated_file.write(journal_file.read())
+                        self.path.unlink()
+                    else:
+                        os.replace(self.path, rotated)
+                users = [dict(user) for user in self.registry.to_dicts()]
+
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.snapshot_path.parent, prefix=self.snapshot_path.name + ".", suffix=".tmp", delete=False
+            ) as users_file:
+                temporary = Path(users_file.name)
+                try:
+                    User.to_json(structure={"users": users}, json_file=users_file)
+                    users_file.flush()
+                    os.fsync(users_file.fileno())
+                except BaseException:
+                    users_file.close()
+                    temporary.unlink(missing_ok=True)
+                    raise
+            os.replace(temporary, self.snapshot_path)
+
+            rotated.unlink(missing_ok=True)
+        logger.info(f"Users journal has been compacted into a snapshot of {len(users)} users.")
+
+
+class UsersLoader:
+    """
+    Hydrates a user registry from the users snapshot and journal, at most once per version.
+
+    The loader remembers the modification time and size of the files it has
+    last loaded (its generation). Loading again is a no-op unless a file has
+    changed on disk, in which case the registry is rebuilt from scratch by
+    replaying the snapshot and then the journal, so records are never duplicated.
+
+    Attributes:
+        path (Path): The users JSON snapshot file.
+        journal (UsersJournal): The journal of users signed up since the snapshot.
+        registry (UserRegistry): The registry being hydrated.
+        generation (Optional[tuple]): The generations of the last loaded snapshot and journal files.
+    """
+
+    def __init__(
+        self, path: Path, journal: UsersJournal, registry: UserRegistry
+    ) -> NoReturn:
+        """
+        Initializes a loader for the given users snapshot and journal.
+
+        Args:
+            path (Path): The users JSON snapshot file.
+            journal (UsersJournal): The journal of users signed up since the snapshot.
+            registry (UserRegistry): The registry being hydrated.
+        """
+        self.path = path
+        self.journal = journal
+        self.registry = registry
+        self.generation: Optional[tuple] = None
+
+    def current_generation(self) -> tuple:
+        """Return the generations of the snapshot, the journal being compacted and the journal."""
+        return (
+            _file_generation(self.path),
+            _file_generation(_rotated_path(self.journal.path)),
+            _file_generation(self.journal.path),
         )
-        user = User(username, email, password, is_premium, is_hashed=True)
-        user.add_user()
+
+    def load(self) -> bool:
+        """
+        Load the users snapshot and journal into the registry if they have changed since the last load.
+
+        Returns:
+            bool: True if the registry has been (re)hydrated, False if it was already up to date.
+        """
+        generation = self.current_generation()
+        if generation == self.generation:
+            return False
+
+        records = self.read_snapshot() + self.read_journals()
+        with self.journal.lock:
+            self.registry.clear()
+            for record in records:
+                self.registry.register(_user_from_record(record))
+
+        self.generation = generation
+        logger.debug(f"{len(self.registry)} users have been loaded from users file.")
+        return True
+
+    def read_snapshot(self) -> List[dict]:
+        """
+        Return the user records of the snapshot file, or none if there is no snapshot yet.
+
+        Raises:
+            UsersFileError: If the snapshot can't be read or is corrupted, rather than losing every user in it.
+        """
+        try:
+            with self.path.open(mode="r") as users_file:
+                data = json.load(users_file)
+        except FileNotFoundError:
+            logger.info(f"{self.path.name} does not exist yet.")
+            return list()
+        except (OSError, json.JSONDecodeError) as error:
+            logger.critical(f"{self.path.name} could not be read: {error}")
+            raise UsersFileError(f"{self.path.name} could not be read: {error}")
+
+        if not isinstance(data, dict) or not isinstance(data.get("users", []), list):
+            logger.critical(f"{self.path.name} does not hold a list of users.")
+            raise UsersFileError(f"{self.path.name} does not hold a list of users.")
+        return data.get("users", [])
+
+    def read_journals(self) -> List[dict]:
+        """Return the user records of the journal, including one left over by an interrupted compaction."""
+        users = list()
+        for path in (_rotated_path(self.journal.path), self.journal.path):
+            if not path.exists():
+                continue
+
+            with path.open(mode="r") as journal_file:
+                for line in journal_file:
+                    try:
+                        users.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A torn last line of an interrupted append.
+                        logger.error(f"Skipped a corrupted record in {path.name}.")
+
+        return users
+
+    def append(self, user: User) -> NoReturn:
+        """
+        Journal a newly signed-up user and mark the resulting version as loaded.
+
+        Args:
+            user (User): The newly signed-up user.
+        """
+        self.journal.append(user)
+        self.generation = self.current_generation()
+
+
+class JsonUserStore(UserStore):
+    """
+    Stores users in the users.json snapshot plus an append-only journal, indexed in memory.
+
+    Attributes:
+        registry (UserRegistry): All loaded users, indexed by username and email.
+        journal (UsersJournal): The journal new users are appended to.
+        loader (UsersLoader): Hydrates the registry from the snapshot and journal.
+    """
+
+    def __init__(self, path: Path = file_path, journal_path: Path = journal_path) -> NoReturn:
+        """
+        Initializes a JSON store.
+
+        Args:
+            path (Path, optional): The users JSON snapshot file.
+            journal_path (Path, optional): The JSONL journal file.
+        """
+        self.registry = UserRegistry()
+        self.journal = UsersJournal(journal_path, path, self.registry)
+        self.loader = UsersLoader(path, self.journal, self.registry)
+
+    def load(self) -> NoReturn:
+        """Hydrate the registry unless the files are already loaded."""
+        self.loader.load()
+
+    def has_username(self, username: str) -> bool:
+        """Return True if the username is already in use."""
+        return self.registry.has_username(username)
+
+    def has_email(self, email: str) -> bool:
+        """Return True if the email address is already in use."""
+        return self.registry.has_email(email)
+
+    def get_by_username(self, username: str) -> Optional[User]:
+        """Return the user with the given username, or None if there is none."""
+        return self.registry.get_by_username(username)
+
+    def add(self, user: User) -> NoReturn:
+        """Register the user in memory and append it to the journal."""
+        self.loader.append(user)
+
+    def update_password(self, user: User) -> NoReturn:
+        """Register the updated user and append it to the journal. Replaying it replaces the older record."""
+        self.loader.append(user)
+
+    def close(self) -> NoReturn:
+        """Fsync and close the journal."""
+        self.journal.close()
+
+
+class SqliteUserStore(UserStore):
+    """
+    Stores users in an SQLite database with unique indexes on username and email.
+
+    Lookups are single indexed queries, so no account is kept in memory. The
+    database runs in WAL mode, so readers don't block the writer. On first use,
+    the accounts of users.json are imported.
+
+    Attributes:
+        path (Path): The SQLite database file.
+    """
+
+    CREATE_TABLE = """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT NOT NULL,
+            email TEXT NOT NULL,
+            hashed_password TEXT NOT NULL,
+            is_premium INTEGER NOT NULL DEFAULT 0
+        )
+    """
+    CREATE_USERNAME_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS users_username ON users (username)"
+    CREATE_EMAIL_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS users_email ON users (email)"
+
+    SELECT_USERNAME = "SELECT 1 FROM users WHERE username = ?"
+    SELECT_EMAIL = "SELECT 1 FROM users WHERE email = ?"
+    SELECT_USER = "SELECT username, email, hashed_password, is_premium FROM users WHERE username = ?"
+    INSERT_USER = "INSERT INTO users (username, email, hashed_password, is_premium) VALUES (?, ?, ?, ?)"
+    UPDATE_PASSWORD = "UPDATE users SET hashed_password = ? WHERE username = ?"
+    COUNT_USERS = "SELECT COUNT(*) FROM users"
+
+    def __init__(self, path: Path, import_path: Optional[Path] = file_path) -> NoReturn:
+        """
+        Initializes an SQLite store.
+
+        Args:
+            path (Path): The SQLite database file.
+            import_path (Optional[Path], optional): A users JSON file imported into an empty database.
+        """
+        self.path = path
+        self.import_path = import_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get the database connection, opening and migrating the database on first use."""
+        if self._connection is None:
+            self._connection = connect_sqlite(
+                self.path, (self.CREATE_TABLE, self.CREATE_USERNAME_INDEX, self.CREATE_EMAIL_INDEX)
+            )
+            self._import_json()
+        return self._connection
+
+    def _import_json(self) -> NoReturn:
+        """Import the users of the JSON file into an empty database."""
+        if self.import_path is None:
+            return
+
+        (count,) = self._connection.execute(self.COUNT_USERS).fetchone()
+        if count:
+            return
+
+        registry = UserRegistry()
+        loader = UsersLoader(
+            self.import_path, UsersJournal(journal_path, self.import_path, registry), registry
+        )
+        loader.load()
+        with self._connection:
+            self._connection.executemany(
+                self.INSERT_USER,
+                (
+                    (user.username, user.email, user._hashed_password, user.is_premium)
+                    for user in registry
+                ),
+            )
+        logger.info(f"{len(registry)} users have been imported into {self.path.name}.")
+
+    def load(self) -> NoReturn:
+        """Open the database. Accounts are queried on demand, not loaded."""
+        self.connection
+
+    def has_username(self, username: str) -> bool:
+        """Return True if the username is already in use."""
+        with self._lock:
+            row = self.connection.execute(self.SELECT_USERNAME, (username.lower(),)).fetchone()
+        return row is not None
+
+    def has_email(self, email: str) -> bool:
+        """Return True if the email address is already in use."""
+        with self._lock:
+            row = self.connection.execute(self.SELECT_EMAIL, (email.lower(),)).fetchone()
+        return row is not None
+
+    def get_by_username(self, username: str) -> Optional[User]:
+        """Return the user with the given username, or None if there is none."""
+        with self._lock:
+            row = self.connection.execute(self.SELECT_USER, (username.lower(),)).fetchone()
+        if row is None:
+            return None
+
+        username, email, hashed_password, is_premium = row
+        return User(username, email, hashed_password, bool(is_premium), is_hashed=True)
+
+    def add(self, user: User) -> NoReturn:
+        """Insert the user into the database."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                self.INSERT_USER,
+                (user.username, user.email, user._hashed_password, user.is_premium),
+            )
+
+    def update_password(self, user: User) -> NoReturn:
+        """Update the stored password hash of the user."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                self.UPDATE_PASSWORD, (user._hashed_password, user.username)
+            )
+
+    def close(self) -> NoReturn:
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def create_store() -> UserStore:
+    """Create the user store selected by the "auth.storage" section of the app config."""
+    backend = storage_config.get("backend", "json")
+    if backend == "json":
+        return JsonUserStore()
+    elif backend == "sqlite":
+        return SqliteUserStore(project_path(storage_config.get("sqlite_path", "auth/models/users.sqlite3")))
+    else:
+        raise ConfigFileError(f"Unknown user storage backend: {backend}")
+
+
+def use_store(store: UserStore) -> NoReturn:
+    """Make the given store the one users are signed up to and signed in from."""
+    User.store = store
+    atexit.register(store.close)
+
+
+use_store(create_store())
+
+
+def save_existed_users() -> NoReturn:
+    """Makes the existing users of the configured store available to the system."""
+    User.store.load()
@@ -1,4 +1,5 @@
 import bcrypt
+import functools
 from typing import Type, NoReturn
 from auth.models.account import Account, ToFile
 from auth.helpers.exceptions import (
@@ -8,10 +9,22 @@ from auth.helpers.exceptions import (
     DuplicateUsernameError,
     SignInError,
 )
+from config.app_config import get_config
 from config.log_config import config_logging
 
 logger = config_logging()
 
+hashing_config = get_config("auth.hashing")
+
+# bcrypt cost factor of newly hashed passwords. Stored hashes with another cost are rehashed on sign-in.
+HASH_ROUNDS: int = hashing_config.get("rounds", 12)
+
+
+@functools.lru_cache(maxsize=1)
+def dummy_password_hash() -> bytes:
+    """Return a hash with the configured cost factor, checked on sign-ins of unknown users. Made on first use."""
+    return bcrypt.hashpw(b"dummy password", bcrypt.gensalt(rounds=HASH_ROUNDS))
+
 
 class User(Account, ToFile):
     """
@@ -22,8 +35,7 @@ class User(Account, ToFile):
         ToFile: Provides utility methods for writing data to a file.
 
     Class Attributes:
-        all (list): A list of all User instances.
-        all_dict (list): A list of dictionaries representing the attributes of all User instances.
+        store (UserStore): The storage users are signed up to and signed in from. Set by auth.models.storage.
 
     Attributes:
         username (str): The username associated with the user.
@@ -43,8 +55,7 @@ class User(Account, ToFile):
         SignInError: If the sign-in process fails due to an invalid username or password.
     """
 
-    all = list()
-    all_dict = list()
+    store = None
 
     def __init__(
         self,
@@ -93,7 +104,7 @@ class User(Account, ToFile):
 
         Notes:
             - If `is_hashed` is set to `True`, the provided password is assumed to be already hashed and is stored as-is.
-            - If `is_hashed` is set to `False` (default), the provided password is hashed using bcrypt before storing it.
+            - If `is_hashed` is set to `False` (default), the provided password is hashed using bcrypt with a random salt of `HASH_ROUNDS` cost before storing it.
         """
         if not isinstance(value, str):
             raise TypeError(f"String expected, got {type(value)}")
@@ -105,9 +116,7 @@ class User(Account, ToFile):
             if self.is_hashed:
                 self._hashed_password = value
             else:
-                salt = b"$2b$12$UJ9EnzPabmOZYRlcphuqdO"
-                hashed_password = bcrypt.hashpw(value.encode("utf-8"), salt)
-                self._hashed_password = hashed_password.decode()
+                self._hashed_password = self.hash_password(value)
 
         del self.is_hashed
 
@@ -121,36 +130,105 @@ class User(Account, ToFile):
             DuplicateUsernameError: If the username is already in use by another user.
             DuplicateEmailError: If the email address is already in use by another user.
         """
-        for user in self.__class__.all:
-            if self.username == user.username:
-                raise DuplicateUsernameError(
-                    "Username is already in use! Try another one."
-                )
+        if self.__class__.store.has_username(self.username):
+            raise DuplicateUsernameError(
+                "Username is already in use! Try another one."
+            )
+
+        if self.__class__.store.has_email(self.email):
+            raise DuplicateEmailError("Email is already in use! Try another one.")
+
+    @staticmethod
+    def hash_password(password: str) -> str:
+        """
+        Hash the password with a random salt and the configured cost factor.
+
+        Args:
+            password (str): The plain password.
+
+        Returns:
+            str: The bcrypt hash of the password.
+        """
+        salt = bcrypt.gensalt(rounds=HASH_ROUNDS)
+        return bcrypt.hashpw(password.encode("utf-8"), salt).decode()
+
+    @property
+    def hash_rounds(self) -> int:
+        """
+        Get the bcrypt cost factor of the stored password hash.
 
-        for user in self.__class__.all:
-            if self.email == user.email:
-                raise DuplicateEmailError("Email is already in use! Try another one.")
+        Returns:
+            int: The cost factor, read from the "$2b$<cost>$" prefix of the hash.
+        """
+        return int(self._hashed_password.split("$")[2])
+
+    def check_password(self, password: str) -> bool:
+        """
+        Check the password against the stored hash.
 
-    def sign_in(self) -> Type["User"] | SignInError:
+        Args:
+            password (str): The plain password.
+
+        Returns:
+            bool: True if the password matches the stored hash.
+        """
+        return bcrypt.checkpw(
+            password.encode("utf-8"), self._hashed_password.encode("utf-8")
+        )
+
+    @classmethod
+    def sign_in(
+        cls, username: str, email: str, password: str
+    ) -> Type["User"] | SignInError:
         """
-        Attempt to sign in the user.
+        Attempt to sign in a user.
+
+        The stored user is looked up by username and the password is verified
+        against its hash once. An unknown username is checked against a dummy
+        hash instead, so it takes as long as a wrong password. If the hash was
+        made with another cost factor than the configured one, it is rehashed
+        and saved.
+
+        Args:
+            username (str): The username entered by the user.
+            email (str): The email address entered by the user.
+            password (str): The password entered by the user.
 
         Returns:
             Type['User'] | SignInError: The signed-in User object if the sign-in is successful, or a SignInError if unsuccessful.
 
         Raises:
+            TypeError: If the provided username, email or password is not a string.
             SignInError: If the sign-in process fails due to an invalid username or password.
         """
-        for user in self.__class__.all:
-            if user.__dict__ == self.__dict__:
-                return user
-        logger.info(f"User {self.__dict__} haven't signed up but wants to sign in.")
-        raise SignInError(f"Invalid username or password. {self} haven't signed up.")
+        for value in (username, email, password):
+            if not isinstance(value, str):
+                raise TypeError(f"String expected, got {type(value)}")
+
+        user = cls.store.get_by_username(username)
+        if user is None:
+            # Do the same bcrypt work as for a known user, so the time taken doesn't reveal which usernames exist.
+            bcrypt.checkpw(password.encode("utf-8"), dummy_password_hash())
+            is_valid = False
+        else:
+            is_valid = user.check_password(password) and user.email == email.lower()
+
+        if not is_valid:
+            logger.info(f"User {username, email} haven't signed up but wants to sign in.")
+            raise SignInError(
+                f"Invalid username or password. {username, email} haven't signed up."
+            )
+
+        if user.hash_rounds != HASH_ROUNDS:
+            user._hashed_password = cls.hash_password(password)
+            cls.store.update_password(user)
+            logger.info(f"{user} password has been rehashed with cost {HASH_ROUNDS}.")
+
+        return user
 
     def add_user(self) -> NoReturn:
-        """add the user to the list of all users."""
-        User.all.append(self)
-        User.all_dict.append(self.__dict__)
+        """Add the user to the store of all users."""
+        User.store.add(self)
 
     def __repr__(self) -> str:
         """Get the string representation of the User instance."""
@@ -0,0 +1 @@
+from .auth_service import AuthService, auth_service
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, NoReturn, Optional
+from auth.models.user import User
+from auth.helpers.exceptions import AuthServiceBusyError
+from config.app_config import get_config
+from config.log_config import config_logging
+
+logger = config_logging()
+
+service_config = get_config("auth.service")
+
+
+class AuthService:
+    """
+    Runs sign-ups and sign-ins on a bounded pool of worker threads.
+
+    bcrypt releases the GIL while hashing, so a thread pool lets several
+    authentications use several cores. At most `max_pending` requests may be
+    queued or running at once; further requests wait up to `submit_timeout`
+    seconds (sync callers) or are rejected immediately (async callers) with
+    an AuthServiceBusyError.
+
+    Attributes:
+        workers (int): Number of worker threads.
+        max_pending (int): Maximum number of queued and running requests.
+        submit_timeout (float): Seconds a sync caller waits for a free slot.
+    """
+
+    def __init__(
+        self,
+        workers: int = service_config.get("workers", 4),
+        max_pending: int = service_config.get("max_pending", 64),
+        submit_timeout: float = service_config.get("submit_timeout", 5.0),
+    ) -> NoReturn:
+        """
+        Initializes an authentication service.
+
+        Args:
+            workers (int, optional): Number of worker threads.
+            max_pending (int, optional): Maximum number of queued and running requests.
+            submit_timeout (float, optional): Seconds a sync caller waits for a free slot.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # Serializes the duplicate check and the insert of sign-ups.
+        self._sign_up_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Get the worker pool, starting it on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="auth-worker"
+            )
+        return self._executor
+
+    def _submit(self, func: Callable, *args, block: bool = True) -> Future:
+        """
+        Submit a request to the worker pool once a slot is free.
+
+        Raises:
+            AuthServiceBusyError: If no slot becomes free in time.
+        """
+        timeout = self.submit_timeout if block else None
+        if not self._slots.acquire(blocking=block, timeout=timeout):
+            with self._metrics_lock:
+                self._rejected += 1
+            logger.warning("Authentication request rejected, the service is busy.")
+            raise AuthServiceBusyError("Too many authentication requests. Please try again later.")
+
+        with self._metrics_lock:
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+
+        try:
+            return self.executor.submit(self._run, func, *args)
+        except BaseException:
+            with self._metrics_lock:
+                self._pending -= 1
+            self._release(failed=True)
+            raise
+
+    def _run(self, func: Callable, *args):
+        """Run a request on a worker thread and account for it."""
+        with self._metrics_lock:
+            self._pending -= 1
+            self._running += 1
+
+        failed = True
+        try:
+            result = func(*args)
+            failed = False
+            return result
+        finally:
+            with self._metrics_lock:
+                self._running -= 1
+            self._release(failed)
+
+    def _release(self, failed: bool) -> NoReturn:
+        """Free a slot and count the finished request."""
+        with self._metrics_lock:
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+        self._slots.release()
+
+    def _sign_up(self, username: str, email: str, password: str) -> User:
+        """Validate and hash a new user, then add it unless the username or email is taken."""
+        user = User(username, email, password)
+        with self._sign_up_lock:
+            user.check_duplicate()
+            user.add_user()
+        return user
+
+    def sign_up(self, username: str, email: str, password: str) -> User:
+        """
+        Sign up a new user on the worker pool and wait for the result.
+
+        Returns:
+            User: The signed-up user.
+
+        Raises:
+            AuthServiceBusyError: If the service is saturated.
+            Any error raised by User validation or User.check_duplicate.
+        """
+        return self._submit(self._sign_up, username, email, password).result()
+
+    def sign_in(self, username: str, email: str, password: str) -> User:
+        """
+        Sign in a user on the worker pool and wait for the result.
+
+        Returns:
+            User: The signed-in user.
+
+        Raises:
+            AuthServiceBusyError: If the service is saturated.
+            SignInError: If the credentials are invalid.
+        """
+        return self._submit(User.sign_in, username, email, password).result()
+
+    async def sign_up_async(self, username: str, email: str, password: str) -> User:
+        """Asynchronous version of sign_up. Rejects immediately when the service is saturated."""
+        future = self._submit(self._sign_up, username, email, password, block=False)
+        return await asyncio.wrap_future(future)
+
+    async def sign_in_async(self, username: str, email: str, password: str) -> User:
+        """Asynchronous version of sign_in. Rejects immediately when the service is saturated."""
+        future = self._submit(User.sign_in, username, email, password, block=False)
+        return await asyncio.wrap_future(future)
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Get the queue-depth metrics of the service.
+
+        Returns:
+            Dict[str, int]: The number of pending (queued), running, completed, failed and rejected requests, and the peak queue depth.
+        """
+        with self._metrics_lock:
+            return {
+                "pending": self._pending,
+                "running": self._running,
+                "peak_pending": self._peak_pending,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> NoReturn:
+        """Wait for the running requests and stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+auth_service = AuthService()
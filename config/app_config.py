@@ -0,0 +1,29 @@
+import tomllib
+from pathlib import Path
+from typing import Any, Dict
+
+# Directory of the project, which the files of the app and relative paths of the config are resolved against.
+project_directory = Path(__file__).resolve().parents[1]
+
+# Reading the application config file.
+app_config_path = project_directory / "config" / "app_config.toml"
+
+with app_config_path.open(mode="rb") as toml_file:
+    app_config: Dict[str, Any] = tomllib.load(toml_file)
+
+
+def get_config(section: str) -> Dict[str, Any]:
+    """
+    Return the settings of a dotted section of the app config, e.g. "auth.storage".
+
+    Missing sections are returned as an empty dictionary so callers can fall back to defaults.
+    """
+    config = app_config
+    for key in section.split("."):
+        config = config.get(key, {})
+    return config
+
+
+def project_path(path: str | Path) -> Path:
+    """Resolve a path of the app, e.g. set in the app config, against the project directory. Absolute paths are kept."""
+    return project_directory / path
@@ -0,0 +1,28 @@
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable
+
+
+def connect_sqlite(path: Path, schema: Iterable[str] = (), **options: Any) -> sqlite3.Connection:
+    """
+    Open an SQLite database of the app and create its tables if they don't exist yet.
+
+    The database runs in WAL mode, so it can be read while it is being written,
+    with synchronous=NORMAL, which only fsyncs at checkpoints. The connection
+    can be used from any thread; callers guard it or keep one per thread.
+
+    Args:
+        path (Path): The SQLite database file.
+        schema (Iterable[str], optional): The CREATE statements of the tables and indexes, run in one transaction.
+        **options: Further arguments of sqlite3.connect, e.g. timeout or isolation_level.
+
+    Returns:
+        sqlite3.Connection: The open connection.
+    """
+    connection = sqlite3.connect(path, check_same_thread=False, **options)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    with connection:
+        for statement in schema:
+            connection.execute(statement)
+    return connection
@@ -1,12 +1,11 @@
 import logging
 import tomllib
-from pathlib import Path
+from config.app_config import project_path
 from config.helpers.exceptions import ConfigFileError
 from config.helpers.type_hint import MainLogConfig
 
 # Reading the logging config file.
-directory = Path.cwd()
-log_config_path = directory / "config" / "log_config.toml"
+log_config_path = project_path("config/log_config.toml")
 
 with log_config_path.open(mode="rb") as toml_file:
     log_config: MainLogConfig = tomllib.load(toml_file)
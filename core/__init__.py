@@ -1 +1,2 @@
 from .app import main
+from .batch import run_script
@@ -1,9 +1,10 @@
 from typing import NoReturn
 from shop.models.products import Product
-from shop.utils.basket import Basket
+from shop.utils.sessions import sessions
 from shop.utils.funcs import (
     show_help,
     show_divider,
+    show_price,
     clear_screen,
 )
 from shop import COMMANDS
@@ -31,12 +32,12 @@ def main() -> NoReturn:
             break
 
     # Shop
-    basket = Basket()
     print(show_help())
 
     while True:
         action = input(f"({user.username}) Which action are you considering: ")
         action = action.lower()
+        basket = sessions.basket(user)
 
         if action in COMMANDS:
             exec_action = COMMANDS[action]
@@ -49,9 +50,8 @@ def main() -> NoReturn:
 
         elif action == "show":
             clear_screen()
-            items, final_price = basket.show()
-            print(items)
-            print("\nHere is your final price after tax: {:.2f}$".format(final_price))
+            print(basket.show())
+            print(show_price(basket.quote()))
             print(show_divider())
 
         elif action == "help":
@@ -60,9 +60,9 @@ def main() -> NoReturn:
 
         elif action == "quit":
             clear_screen()
-            items, final_price = basket.show()
-            print(items)
-            print("\nHere is your final price after tax: {:.2f}$".format(final_price))
+            print(basket.show())
+            print(show_price(basket.quote()))
+            sessions.end(user)
             break
 
         else:
@@ -0,0 +1,275 @@
+import contextlib
+import io
+import json
+import shlex
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, NoReturn, Optional, TextIO
+from auth.models.user import User
+from auth.models.storage import save_existed_users
+from auth.services import auth_service
+from shop.models.products import Product
+from shop.handlers.change_index_command import parse_moves
+from shop.utils.basket import Basket
+from shop.utils.funcs import title_and_strip_names
+from shop.utils.orders import all_applied, parse_order, read_order_file, summarize_results
+from shop.utils.paginator import Paginator
+from shop.utils.sessions import sessions
+from shop.helpers.exceptions import ScriptError
+from config.log_config import config_logging
+
+logger = config_logging()
+
+# Commands of a script that sign a user in, with their username, email and password as arguments.
+AUTH_COMMANDS = ("sign in", "sign up")
+# Number of products returned per "products" command.
+PRODUCTS_PAGE_SIZE = 5
+
+
+def _quote_to_dict(basket: Basket) -> Dict[str, str]:
+    """Return the prices of a basket as strings, so they serialise without losing precision."""
+    return {field: str(value) for field, value in basket.quote()._asdict().items()}
+
+
+class BatchRunner:
+    """
+    Runs shop commands read from a script, without prompts or screen clearing.
+
+    Every non-empty line of the script is one command, a command name followed
+    by its arguments in the form the interactive prompts accept:
+
+        sign in <username> <email> <password>
+        sign up <username> <email> <password>
+        add Gaming Mouse x20, Printer
+        remove Printer x2
+        prioritize Gaming Mouse:1, Printer:3
+        import orders.csv
+        search Printer
+        products [cursor]
+        count
+        show
+        quit
+
+    Lines starting with # are comments. Arguments of the sign in and sign up
+    commands are split like a shell command line, so they may be quoted. A
+    script can sign in several users one after the other; "quit" checks the
+    basket of the current user out.
+
+    Every command writes one JSON object to the output, on its own line, with
+    the line number, the command, whether it succeeded, its elapsed time and
+    either its result or its error. Passwords are never written.
+
+    Attributes:
+        output (TextIO): Where the results are written.
+        stop_on_error (bool): Stop at the first command that fails.
+        user (Optional[User]): The signed-in user, if any.
+        failures (int): Number of commands that failed so far.
+    """
+
+    def __init__(self, output: TextIO, stop_on_error: bool = False) -> NoReturn:
+        """
+        Initializes a runner with no signed-in user.
+
+        Args:
+            output (TextIO): Where the results are written.
+            stop_on_error (bool, optional): Stop at the first command that fails. Defaults to False.
+        """
+        self.output = output
+        self.stop_on_error = stop_on_error
+        self.user: Optional[User] = None
+        self.failures = 0
+        self._commands: Dict[str, Callable[[str], Dict[str, Any]]] = {
+            "add": self.add,
+            "remove": self.remove,
+            "prioritize": self.prioritize,
+            "import": self.import_order,
+            "search": self.search,
+            "products": self.products,
+            "count": self.count,
+            "show": self.show,
+            "quit": self.quit,
+        }
+
+    def run(self, lines: Iterable[str]) -> int:
+        """
+        Run every command of a script.
+
+        Args:
+            lines (Iterable[str]): The lines of the script.
+
+        Returns:
+            int: Number of commands that failed.
+        """
+        save_existed_users()
+
+        for number, line in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            is_ok = self.run_command(number, line)
+            if not is_ok and self.stop_on_error:
+                break
+
+        return self.failures
+
+    def run_command(self, number: int, line: str) -> bool:
+        """
+        Run one command of a script and write its result.
+
+        Returns:
+            bool: Whether the command succeeded.
+        """
+        name, arguments = self._split(line)
+        record: Dict[str, Any] = {"line": number, "command": name}
+        started = time.perf_counter()
+
+        try:
+            # Models and handlers print messages meant for the terminal; they are not part of the results.
+            with contextlib.redirect_stdout(io.StringIO()):
+                if name in AUTH_COMMANDS:
+                    result = self.authenticate(name, arguments)
+                elif name in self._commands:
+                    result = self._commands[name](arguments)
+                else:
+                    raise ScriptError(f"Unknown command: {name}")
+        except Exception as error:
+            logger.info(f"Script line {number} ({name}) failed: {error}")
+            record.update(ok=False, error=str(error), error_type=type(error).__name__)
+        else:
+            record.update(ok=result.pop("ok", True), result=result)
+        record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        if not record["ok"]:
+            self.failures += 1
+        self.output.write(json.dumps(record) + "\n")
+        self.output.flush()
+        return record["ok"]
+
+    @staticmethod
+    def _split(line: str):
+        """Split a script line into its command name and the rest of the line."""
+        lowered = line.lower()
+        for name in AUTH_COMMANDS:
+            if lowered == name or lowered.startswith(name + " "):
+                return name, line[len(name):].strip()
+
+        name, _, arguments = line.partition(" ")
+        return name.lower(), arguments.strip()
+
+    @property
+    def basket(self) -> Basket:
+        """
+        Get the basket of the signed-in user.
+
+        Raises:
+            ScriptError: If no user is signed in.
+        """
+        if self.user is None:
+            raise ScriptError("No user is signed in. Start the script with sign in or sign up.")
+        return sessions.basket(self.user)
+
+    def authenticate(self, name: str, arguments: str) -> Dict[str, Any]:
+        """Sign a user in or up with the username, email and password of the arguments."""
+        try:
+            username, email, password = shlex.split(arguments)
+        except ValueError:
+            raise ScriptError(f"{name} needs a username, an email and a password.")
+
+        if name == "sign up":
+            self.user = auth_service.sign_up(username, email, password)
+        else:
+            self.user = auth_service.sign_in(username, email, password)
+        return {"username": self.user.username, "is_premium": self.user.is_premium}
+
+    def add(self, arguments: str) -> Dict[str, Any]:
+        """Add items with optional quantities, such as "Gaming Mouse x20, Printer"."""
+        results = self.basket.add_quantities(parse_order(title_and_strip_names(arguments.split(","))))
+        return self._order_results(results)
+
+    def remove(self, arguments: str) -> Dict[str, Any]:
+        """Remove items with optional quantities, such as "Gaming Mouse x2, Printer"."""
+        results = self.basket.remove_quantities(parse_order(title_and_strip_names(arguments.split(","))))
+        return self._order_results(results)
+
+    def import_order(self, arguments: str) -> Dict[str, Any]:
+        """Add the order of a .csv or .json file."""
+        if not arguments:
+            raise ScriptError("import needs the path of an order file.")
+        results = self.basket.add_quantities(read_order_file(Path(arguments).expanduser()))
+        return self._order_results(results)
+
+    @staticmethod
+    def _order_results(results) -> Dict[str, Any]:
+        """Return the per-line results of a bulk operation; it succeeds if every line was fully applied."""
+        return {
+            "ok": all_applied(results),
+            "lines": [result._asdict() for result in results],
+            "summary": summarize_results(results),
+        }
+
+    def prioritize(self, arguments: str) -> Dict[str, Any]:
+        """Move items of the basket, such as "Gaming Mouse:1, Printer:3"."""
+        basket = self.basket
+        moves = parse_moves(arguments)
+        basket.change_indexes(moves)
+        return {"positions": {item_name: basket.position(item_name) for item_name, _ in moves}}
+
+    def search(self, arguments: str) -> Dict[str, Any]:
+        """Look an item up in the basket and in the catalog."""
+        item_name = arguments.title()
+        return {
+            "in_basket": item_name in self.basket.basket,
+            "suggestions": Product.catalog.search.suggest(item_name),
+        }
+
+    def products(self, arguments: str) -> Dict[str, Any]:
+        """Return the page of the catalog starting at the cursor of the arguments, 0 by default."""
+        try:
+            cursor = int(arguments or 0)
+        except ValueError:
+            raise ScriptError(f"The cursor of products must be a number, got {arguments}.")
+
+        page = Paginator(Product.catalog.products, PRODUCTS_PAGE_SIZE).page(cursor)
+        result = page._asdict()
+        result["items"] = [product._asdict() for product in page.items]
+        return result
+
+    def count(self, arguments: str) -> Dict[str, Any]:
+        """Return the number of distinct products in the basket."""
+        return {"count": len(self.basket)}
+
+    def show(self, arguments: str) -> Dict[str, Any]:
+        """Return the lines and prices of the basket."""
+        basket = self.basket
+        return {
+            "lines": [
+                {"name": item["name"], "unit": item["unit"], "price": item["price"], "category": item["category"]}
+                for item in basket.items()
+            ],
+            **_quote_to_dict(basket),
+        }
+
+    def quit(self, arguments: str) -> Dict[str, Any]:
+        """Check the basket of the signed-in user out and sign them out."""
+        basket = self.basket
+        result = {"lines": len(basket), **_quote_to_dict(basket)}
+        sessions.end(self.user)
+        self.user = None
+        return result
+
+
+def run_script(lines: Iterable[str], output: TextIO, stop_on_error: bool = False) -> int:
+    """
+    Run the commands of a script headlessly, writing one JSON result per command.
+
+    Args:
+        lines (Iterable[str]): The lines of the script, e.g. an open file or sys.stdin.
+        output (TextIO): Where the results are written.
+        stop_on_error (bool, optional): Stop at the first command that fails. Defaults to False.
+
+    Returns:
+        int: Number of commands that failed.
+    """
+    logger.debug("Script mode has been started.")
+    return BatchRunner(output, stop_on_error).run(lines)
@@ -1,4 +1,32 @@
-from core import main
+import argparse
+import sys
+from core import main, run_script
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse the command line of the application."""
+    parser = argparse.ArgumentParser(description="TechWorld shopping list.")
+    parser.add_argument(
+        "--script",
+        metavar="FILE",
+        help="run the commands of a script file headlessly, or of stdin with -, and print one JSON result per command",
+    )
+    parser.add_argument(
+        "--stop-on-error",
+        action="store_true",
+        help="stop the script at the first command that fails",
+    )
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    main()
+    arguments = parse_arguments()
+
+    if arguments.script is None:
+        main()
+    elif arguments.script == "-":
+        sys.exit(1 if run_script(sys.stdin, sys.stdout, arguments.stop_on_error) else 0)
+    else:
+        with open(arguments.script, encoding="utf-8") as script_file:
+            failures = run_script(script_file, sys.stdout, arguments.stop_on_error)
+        sys.exit(1 if failures else 0)
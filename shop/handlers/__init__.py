@@ -2,4 +2,6 @@ from .add_command import handle_add_command
 from .remove_command import handle_remove_command
 from .search_command import handle_search_command
 from .change_index_command import handle_change_index
-from .count_command import handle_count_command
\ No newline at end of file
+from .count_command import handle_count_command
+from .browse_command import handle_browse_command
+from .import_command import handle_import_command
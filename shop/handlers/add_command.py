@@ -7,7 +7,7 @@ from shop.utils.funcs import (
     clear_screen,
     guide_message,
 )
-from shop.helpers.exceptions import ItemDoesNotExistError
+from shop.utils.orders import all_applied, parse_order
 from config.log_config import config_logging
 
 logger = config_logging()
@@ -20,7 +20,7 @@ def handle_add_command(basket: Basket) -> NoReturn:
     print(show_divider())
 
     additional_items = input(
-        "Enter the name(s) which represents the product(s) you're considering to add: "
+        "Enter the name(s) which represents the product(s) you're considering to add, with an optional quantity such as Gaming Mouse x20: "
     ).split(",")
 
     try:
@@ -38,9 +38,14 @@ def handle_add_command(basket: Basket) -> NoReturn:
     else:
         clear_screen()
         try:
-            basket.add_items(additional_items)
-        except ItemDoesNotExistError as error:
-            print(error, "Type and Enter products for seeing products.")
+            results = basket.add_quantities(parse_order(additional_items))
+            for result in results:
+                print(result.message)
+            if not all_applied(results):
+                print("Type and Enter products for seeing products.")
+        except ValueError as error:
+            logger.info(f"User entered an invalid quantity: {error}")
+            print(error, "Please try again.")
         except Exception as error:
             logger.critical(error)
             print("Error 500! Call the Administrator.")
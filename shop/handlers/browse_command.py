@@ -0,0 +1,76 @@
+from typing import NoReturn, Optional
+from shop.models.products import Product
+from shop.utils.basket import Basket
+from shop.utils.funcs import (
+    parse_price_cents,
+    show_divider,
+    clear_screen,
+    guide_message,
+)
+from config.log_config import config_logging
+
+logger = config_logging()
+
+
+def parse_price_bound(value: str) -> Optional[int]:
+    """
+    Parse one side of a price range into cents, or None if it is left empty.
+
+    Raises:
+        TypeError: If the bound is not a valid price. Negative, infinite and NaN bounds are rejected by parse_price_cents.
+    """
+    value = value.strip()
+    if not value:
+        return None
+    return parse_price_cents(value)
+
+
+def handle_browse_command(basket: Basket) -> NoReturn:
+    clear_screen()
+
+    facets = Product.catalog.facets
+    categories = facets.categories()
+    print(f"Categories: {', '.join(categories)}")
+    print(show_divider())
+
+    category = input(
+        "Enter a category, or leave it empty for every category: "
+    ).title().strip()
+
+    if category == "Back":
+        clear_screen()
+    elif category and category not in categories:
+        clear_screen()
+        logger.info(f"User browsed the unknown category {category}.")
+        print(f"{category} is not a category of our store.")
+        print(guide_message())
+    else:
+        price_range = input(
+            "Enter a price range such as 50-200, or leave it empty for any price: "
+        )
+        in_stock = input("Only show products in stock? [y/n]: ").lower() == "y"
+        descending = input("Sort by price, [a]scending or [d]escending: ").lower() == "d"
+
+        try:
+            lowest, _, highest = price_range.partition("-")
+            min_cents, max_cents = parse_price_bound(lowest), parse_price_bound(highest)
+            if min_cents is not None and max_cents is not None and min_cents > max_cents:
+                raise ValueError(f"Inverted price range: {price_range}")
+        except (TypeError, ValueError, OverflowError):
+            clear_screen()
+            logger.info("User entered an invalid price range.")
+            print("The price range must look like 50-200. Please try again.")
+            print(guide_message())
+        else:
+            products = facets.browse(
+                category or None, min_cents, max_cents, in_stock, descending
+            )
+            logger.debug(f"User browsed {len(products)} products.")
+
+            clear_screen()
+            if len(products) == 0:
+                print("No products match your filters.")
+            else:
+                Product.show_all(products)
+
+    print(show_divider())
@@ -1,6 +1,7 @@
-from typing import NoReturn
+from typing import List, NoReturn, Tuple
 from shop.utils.basket import Basket
 from shop.utils.funcs import (
+    title_and_strip_names,
     show_divider,
     clear_screen,
     guide_message,
@@ -14,19 +15,49 @@ from config.log_config import config_logging
 logger = config_logging()
 
 
+def parse_moves(moves: str) -> List[Tuple[str, int]]:
+    """
+    Parse moves such as "Gaming Mouse:1, Printer:3" into (name, new index) pairs.
+
+    Raises:
+        ValueError: If a new index is missing or is not a number.
+    """
+    parsed_moves = list()
+    for move in moves.split(","):
+        item_name, _, str_new_index = move.rpartition(":")
+        item_name = title_and_strip_names([item_name])[0]
+        parsed_moves.append((item_name, int(str_new_index)))
+
+    return parsed_moves
+
+
 def handle_change_index(basket: Basket) -> NoReturn:
     clear_screen()
 
-    items, _ = basket.show()
-    print(items)
+    print(basket.show())
     print(show_divider())
 
     item_name = input(
-        "Please enter the name of the item you're considering to move: ").title()
+        "Please enter the name of the item you're considering to move, or several moves such as Gaming Mouse:1, Printer:3: "
+    ).title()
     print(show_divider())
 
-    if item_name == "Back":
+    if item_name.strip() == "Back":
         clear_screen()
+    elif ":" in item_name:
+        try:
+            moves = parse_moves(item_name)
+            try:
+                basket.change_indexes(moves)
+            except ItemDoesNotExistError as error:
+                print(error)
+            except WrongOrderError as error:
+                print(error, "Please try again.")
+        except ValueError:
+            logger.info("User entered a move whose new index is not a number.")
+            print("Every move must look like name:number. Please try again.")
+
+        print(guide_message())
     else:
         str_new_index = input(
             "Enter where you want the item place in your shopping list(enter a number): ")
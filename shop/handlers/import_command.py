@@ -0,0 +1,45 @@
+from pathlib import Path
+from typing import NoReturn
+from shop.utils.basket import Basket
+from shop.utils.orders import read_order_file, summarize_results
+from shop.utils.funcs import (
+    show_divider,
+    clear_screen,
+    guide_message,
+)
+from shop.helpers.exceptions import OrderFileError
+from config.log_config import config_logging
+
+logger = config_logging()
+
+
+def handle_import_command(basket: Basket) -> NoReturn:
+    clear_screen()
+
+    order_path = input(
+        "Enter the path of a .csv (name,quantity) or .json order file to add to your basket: "
+    ).strip()
+
+    if order_path.title() == "Back":
+        clear_screen()
+    else:
+        clear_screen()
+        try:
+            lines = read_order_file(Path(order_path).expanduser())
+        except OrderFileError as error:
+            logger.info(f"User imported an invalid order file: {error}")
+            print(error, "Please try again.")
+        else:
+            try:
+                results = basket.add_quantities(lines)
+                for result in results:
+                    print(result.message)
+                print(show_divider())
+                print(summarize_results(results))
+                logger.debug(f"User imported {len(lines)} order lines from {order_path}.")
+            except Exception as error:
+                logger.critical(error)
+                print("Error 500! Call the Administrator.")
+        print(guide_message())
+
+    print(show_divider())
@@ -5,7 +5,7 @@ from shop.utils.funcs import (
     clear_screen,
     guide_message,
 )
-from shop.helpers.exceptions import ItemDoesNotExistError
+from shop.utils.orders import all_applied, parse_order
 from config.log_config import config_logging
 
 logger = config_logging()
@@ -14,12 +14,11 @@ logger = config_logging()
 def handle_remove_command(basket: Basket):
     clear_screen()
 
-    items, _ = basket.show()
-    print(items)
+    print(basket.show())
     print(show_divider())
 
     items_to_delete = input(
-        "Enter the name(s) which represents the product(s) you're considering to remove: "
+        "Enter the name(s) which represents the product(s) you're considering to remove, with an optional quantity such as Gaming Mouse x20: "
     ).split(",")
 
     try:
@@ -37,9 +36,14 @@ def handle_remove_command(basket: Basket):
     else:
         clear_screen()
         try:
-            basket.remove_items(items_to_delete)
-        except ItemDoesNotExistError as error:
-            print(error, "Type and Enter show for seeing your basket.")
+            results = basket.remove_quantities(parse_order(items_to_delete))
+            for result in results:
+                print(result.message)
+            if not all_applied(results):
+                print("Type and Enter show for seeing your basket.")
+        except ValueError as error:
+            logger.info(f"User entered an invalid quantity: {error}")
+            print(error, "Please try again.")
         except Exception as error:
             logger.critical(error)
             print("Error 500! Call the Administrator.")
@@ -1,4 +1,5 @@
 from shop.utils.basket import Basket
+from shop.models.products import Product
 from typing import NoReturn
 from shop.utils.funcs import (
     show_divider,
@@ -24,4 +25,8 @@ def handle_search_command(basket: Basket) -> NoReturn:
         print(show_divider())
         print(message)
 
+        suggestions = Product.catalog.search.suggest(item_for_search)
+        if suggestions and suggestions != [item_for_search]:
+            print(f"Products matching your search: {', '.join(suggestions)}.")
+
     print(show_divider())
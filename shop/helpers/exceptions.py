@@ -6,3 +6,28 @@ class ItemDoesNotExistError(ValueError):
 class WrongOrderError(IndexError):
     """WrongOrderError: Raised when there is an incorrect order or index."""
     pass
+
+
+class CatalogFileError(ValueError):
+    """CatalogFileError: Raised when the products file can't be ingested."""
+    pass
+
+
+class BasketTotalsError(ArithmeticError):
+    """BasketTotalsError: Raised when the running totals of a basket differ from a full recomputation."""
+    pass
+
+
+class OutOfStockError(ValueError):
+    """OutOfStockError: Raised when fewer units of a product are in stock than requested."""
+    pass
+
+
+class OrderFileError(ValueError):
+    """OrderFileError: Raised when an order file can't be read."""
+    pass
+
+
+class ScriptError(ValueError):
+    """ScriptError: Raised when a command of a script can't be run, e.g. it is unknown or misses arguments."""
+    pass
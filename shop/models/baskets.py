@@ -0,0 +1,268 @@
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NoReturn, Optional
+from config.database import connect_sqlite
+from config.log_config import config_logging
+
+logger = config_logging()
+
+
+class BasketStore(ABC):
+    """
+    Storage of the baskets of the users, keyed by username.
+
+    A basket is stored as the dict returned by Basket.to_dict.
+    """
+
+    @abstractmethod
+    def load(self, username: str) -> Optional[Dict[str, Any]]:
+        """Return the stored basket of the user, or None if there is none."""
+
+    @abstractmethod
+    def save(self, username: str, basket: Dict[str, Any]) -> NoReturn:
+        """Store the basket of the user, replacing the previous one."""
+
+    @abstractmethod
+    def delete(self, username: str) -> NoReturn:
+        """Delete the stored basket of the user, if there is one."""
+
+    def write_many(self, baskets: Dict[str, Dict[str, Any]], deleted: List[str]) -> NoReturn:
+        """Store several baskets and delete others at once."""
+        for username, basket in baskets.items():
+            self.save(username, basket)
+        for username in deleted:
+            self.delete(username)
+
+    def close(self) -> NoReturn:
+        """Release the resources of the store."""
+
+
+class SqliteBasketStore(BasketStore):
+    """
+    Stores baskets in an SQLite database, one JSON document per user.
+
+    The database runs in WAL mode, so the baskets of other users can be read
+    while one is being written.
+
+    Attributes:
+        path (Path): The SQLite database file.
+    """
+
+    CREATE_TABLE = """
+        CREATE TABLE IF NOT EXISTS baskets (
+            username TEXT PRIMARY KEY,
+            basket TEXT NOT NULL
+        )
+    """
+
+    SELECT_BASKET = "SELECT basket FROM baskets WHERE username = ?"
+    UPSERT_BASKET = (
+        "INSERT INTO baskets (username, basket) VALUES (?, ?) "
+        "ON CONFLICT (username) DO UPDATE SET basket = excluded.basket"
+    )
+    DELETE_BASKET = "DELETE FROM baskets WHERE username = ?"
+
+    def __init__(self, path: Path) -> NoReturn:
+        """
+        Initializes an SQLite store.
+
+        Args:
+            path (Path): The SQLite database file.
+        """
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get the database connection, opening and migrating the database on first use."""
+        if self._connection is None:
+            self._connection = connect_sqlite(self.path, (self.CREATE_TABLE,))
+        return self._connection
+
+    def load(self, username: str) -> Optional[Dict[str, Any]]:
+        """Return the stored basket of the user, or None if there is none."""
+        with self._lock:
+            row = self.connection.execute(self.SELECT_BASKET, (username.lower(),)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def save(self, username: str, basket: Dict[str, Any]) -> NoReturn:
+        """Store the basket of the user, replacing the previous one."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                self.UPSERT_BASKET, (username.lower(), json.dumps(basket))
+            )
+
+    def delete(self, username: str) -> NoReturn:
+        """Delete the stored basket of the user, if there is one."""
+        with self._lock, self.connection:
+            self.connection.execute(self.DELETE_BASKET, (username.lower(),))
+
+    def write_many(self, baskets: Dict[str, Dict[str, Any]], deleted: List[str]) -> NoReturn:
+        """Store several baskets and delete others in a single transaction."""
+        with self._lock, self.connection:
+            self.connection.executemany(
+                self.UPSERT_BASKET,
+                ((username.lower(), json.dumps(basket)) for username, basket in baskets.items()),
+            )
+            self.connection.executemany(
+                self.DELETE_BASKET, ((username.lower(),) for username in deleted)
+            )
+
+    def close(self) -> NoReturn:
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class WriteBehindBasketStore(BasketStore):
+    """
+    Coalesces basket writes in memory and flushes them to another store in the background.
+
+    A changed basket is only marked as pending, with a function returning its
+    current contents. A background thread writes every pending basket in one
+    batch every `flush_interval` seconds, or as soon as `batch_size` baskets are
+    pending, so any number of changes to a basket between two flushes costs a
+    single write, and commands never wait for the disk. Baskets pending a
+    flush are read from memory, and the pending ones are flushed on close.
+
+    Attributes:
+        store (BasketStore): The store pending baskets are flushed to.
+        flush_interval (float): Seconds between two flushes.
+        batch_size (int): Number of pending baskets that triggers an early flush.
+    """
+
+    def __init__(
+        self, store: BasketStore, flush_interval: float = 2.0, batch_size: int = 256
+    ) -> NoReturn:
+        """
+        Initializes a write-behind store. The flushing thread is started on the first write.
+
+        Args:
+            store (BasketStore): The store pending baskets are flushed to.
+            flush_interval (float, optional): Seconds between two flushes. Defaults to 2.
+            batch_size (int, optional): Number of pending baskets that triggers an early flush. Defaults to 256.
+        """
+        self.store = store
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # Pending baskets by username: a function returning the contents to store, or None to delete it.
+        self._pending: Dict[str, Optional[Callable[[], Dict[str, Any]]]] = dict()
+        # Baskets taken by the flush in progress, until they are written.
+        self._flushing: Dict[str, Optional[Callable[[], Dict[str, Any]]]] = dict()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+
+    def _mark(self, username: str, source: Optional[Callable[[], Dict[str, Any]]]) -> NoReturn:
+        """Make a basket pending, starting the flushing thread if needed."""
+        with self._lock:
+            self._pending[username.lower()] = source
+            pending = len(self._pending)
+
+            if self._flusher is None and not self._closed:
+                self._flusher = threading.Thread(
+                    target=self._run, name="baskets-write-behind", daemon=True
+                )
+                self._flusher.start()
+
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def save_later(self, username: str, source: Callable[[], Dict[str, Any]]) -> NoReturn:
+        """
+        Mark the basket of a user as changed. Its contents are only read when flushed.
+
+        Args:
+            username (str): The owner of the basket.
+            source (Callable[[], Dict[str, Any]]): Returns the contents of the basket, e.g. Basket.to_dict.
+        """
+        self._mark(username, source)
+
+    def save(self, username: str, basket: Dict[str, Any]) -> NoReturn:
+        """Store the basket of the user on the next flush."""
+        self._mark(username, lambda: basket)
+
+    def delete(self, username: str) -> NoReturn:
+        """Delete the stored basket of the user on the next flush."""
+        self._mark(username, None)
+
+    def load(self, username: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the basket of the user, from memory if it is pending or being flushed.
+
+        Loads don't wait for a flush in progress, so restores of several users run side by side.
+        """
+        key = username.lower()
+        with self._lock:
+            if key in self._pending:
+                is_pending, source = True, self._pending[key]
+            elif key in self._flushing:
+                is_pending, source = True, self._flushing[key]
+            else:
+                is_pending, source = False, None
+
+        if is_pending:
+            return None if source is None else source()
+        return self.store.load(key)
+
+    def flush(self) -> NoReturn:
+        """Write every pending basket to the store in one batch."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, dict()
+                self._flushing = pending
+            if not pending:
+                return
+
+            try:
+                baskets = {
+                    username: source() for username, source in pending.items() if source is not None
+                }
+                deleted = [username for username, source in pending.items() if source is None]
+                self.store.write_many(baskets, deleted)
+            except Exception:
+                # Keep the baskets pending, unless they have been changed again meanwhile.
+                with self._lock:
+                    for username, source in pending.items():
+                        self._pending.setdefault(username, source)
+                    self._flushing = dict()
+                raise
+
+            with self._lock:
+                self._flushing = dict()
+
+        logger.debug(f"{len(pending)} baskets have been flushed.")
+
+    def _run(self) -> NoReturn:
+        """Flush pending baskets until the store is closed."""
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as error:
+                logger.error(f"Baskets could not be flushed: {error}")
+
+    def close(self) -> NoReturn:
+        """Stop the flushing thread, flush the pending baskets and close the store."""
+        with self._lock:
+            self._closed = True
+            flusher = self._flusher
+        self._wake.set()
+        if flusher is not None:
+            flusher.join()
+
+        try:
+            self.flush()
+        finally:
+            self.store.close()
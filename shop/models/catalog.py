@@ -0,0 +1,226 @@
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NoReturn, Optional, Sequence
+from shop.models.products import Product
+from shop.models.columnar import ColumnarIndex
+from shop.models.ingestion import IngestionReport, ingest
+from shop.models.snapshot import CatalogSnapshot, source_key
+from shop.models.mapped import MappedIndex, write_mapped_catalog
+from shop.models.search import CatalogSearch
+from shop.models.facets import CatalogFacets
+from config.app_config import get_config, project_path
+from config.helpers.exceptions import ConfigFileError
+from config.log_config import config_logging
+
+logger = config_logging()
+
+catalog_config = get_config("shop.catalog")
+default_path = Path(__file__).resolve().parent / "products.csv"
+
+
+def resolve_catalog_path() -> Path:
+    """Return the products file set in the "shop.catalog" config, or the one shipped with the package."""
+    configured_path = catalog_config.get("path")
+    if not configured_path:
+        return default_path
+    return project_path(configured_path)
+
+
+class CatalogIndex:
+    """
+    The loaded products together with lookup tables built once at load time.
+
+    Attributes:
+        products (List[Product]): All products, in file order.
+        by_name (Dict[str, Product]): Products keyed by their name.
+        by_id (Dict[int, Product]): Products keyed by their ID.
+        by_category (Dict[str, List[Product]]): Products of each category, in file order.
+    """
+
+    def __init__(self, products: Iterable[Product] = ()) -> NoReturn:
+        """
+        Initializes the index of the given products.
+
+        Args:
+            products (Iterable[Product], optional): The products to index.
+        """
+        self.products: List[Product] = list()
+        self.by_name: Dict[str, Product] = dict()
+        self.by_id: Dict[int, Product] = dict()
+        self.by_category: Dict[str, List[Product]] = dict()
+
+        for product in products:
+            self.add(product)
+
+    def add(self, product: Product) -> NoReturn:
+        """Add a product to the products and to every lookup table."""
+        self.products.append(product)
+        self.by_name[product.name] = product
+        self.by_id[product.id] = product
+        self.by_category.setdefault(product.category, []).append(product)
+
+
+class Catalog:
+    """
+    The products of the store, read from the products file on first access.
+
+    Creating a catalog does no I/O. The products file is parsed the first time
+    the products are needed and kept, indexed by name, ID and category, until
+    `reload` is called.
+
+    The file is streamed in chunks of `chunk_size` rows. Rows that fail
+    validation are left out and described in `report`. With the "columnar"
+    storage of the config, products are kept in a ColumnarIndex instead of a
+    CatalogIndex. Unless disabled in the config, the loaded index is cached in
+    a binary snapshot that later loads use while the products file is unchanged.
+
+    With the "mapped" storage, the columnar index is written once to a file
+    that every process maps read-only, so workers on a host share one copy of
+    the catalog through the OS page cache.
+
+    Attributes:
+        path (Path): The products CSV file.
+        chunk_size (int): Number of rows parsed at a time.
+        storage (str): How loaded products are kept in memory, "objects", "columnar" or "mapped".
+        snapshot (Optional[CatalogSnapshot]): The binary cache of the loaded index, if enabled.
+        report (Optional[IngestionReport]): The outcome of the last load.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> NoReturn:
+        """
+        Initializes a catalog that is not loaded yet.
+
+        Args:
+            path (Optional[Path], optional): The products CSV file. Defaults to the configured one.
+        """
+        self.path = path if path is not None else resolve_catalog_path()
+        self.storage = catalog_config.get("storage", "objects")
+        self.chunk_size = catalog_config.get("chunk_size", 10000)
+        self.max_reported_errors = catalog_config.get("max_reported_errors", 100)
+        self.snapshot: Optional[CatalogSnapshot] = None
+        if catalog_config.get("snapshot", True):
+            snapshot_path = self.path.with_name(self.path.name + ".snapshot")
+            self.snapshot = CatalogSnapshot(snapshot_path, self.path)
+        self.report: Optional[IngestionReport] = None
+        self._index: Optional[CatalogIndex] = None
+        self._search: Optional[CatalogSearch] = None
+        self._facets: Optional[CatalogFacets] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Return True if the products file has been read."""
+        return self._index is not None
+
+    @property
+    def mapped_path(self) -> Path:
+        """Get the memory-mapped catalog file of the "mapped" storage."""
+        return self.path.with_name(self.path.name + ".mmap")
+
+    @property
+    def index(self) -> CatalogIndex | ColumnarIndex:
+        """Get the indexed products, loading the products file on first access."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._read()
+        return self._index
+
+    @property
+    def products(self) -> Sequence[Product]:
+        """Get all products, in file order."""
+        return self.index.products
+
+    @property
+    def search(self) -> CatalogSearch:
+        """Get the search index of the product names, building it on first access."""
+        search = self._search
+        if search is None:
+            search = self._search = CatalogSearch(self.index.by_name)
+        return search
+
+    @property
+    def facets(self) -> CatalogFacets:
+        """Get the price-sorted orderings used for filtered browsing, building them on first access."""
+        facets = self._facets
+        if facets is None:
+            facets = self._facets = CatalogFacets(self.index.products)
+        return facets
+
+    def reload(self) -> NoReturn:
+        """Read the products file again, replacing the loaded products."""
+        index = self._read()
+        with self._lock:
+            self._index = index
+            self._search = None
+            self._facets = None
+
+    def add(self, product: Product) -> NoReturn:
+        """Add a product to the catalog."""
+        self.index.add(product)
+        self._search = None
+        self._facets = None
+
+    def get_by_name(self, name: str) -> Optional[Product]:
+        """Return the product with the given name, or None if there is none."""
+        return self.index.by_name.get(name)
+
+    def get_by_id(self, id: int) -> Optional[Product]:
+        """Return the product with the given ID, or None if there is none."""
+        return self.index.by_id.get(id)
+
+    def get_category(self, category: str) -> List[Product]:
+        """Return the products of the given category."""
+        return self.index.by_category.get(category, [])
+
+    def _read(self) -> CatalogIndex | ColumnarIndex:
+        """Load the index from the snapshot, or stream the products file into a new one."""
+        if self.storage == "mapped":
+            return self._read_mapped()
+
+        if self.snapshot is not None:
+            snapshot = self.snapshot.load(self.storage)
+            if snapshot is not None:
+                self.report = snapshot["report"]
+                return snapshot["index"]
+
+        source = source_key(self.path) if self.snapshot is not None else None
+        index = self._ingest()
+        if self.snapshot is not None:
+            self.snapshot.write(self.storage, index, self.report, source)
+        return index
+
+    def _read_mapped(self) -> MappedIndex:
+        """Map the catalog file, building it from the products file first if it is missing or stale."""
+        index = MappedIndex.open_if_current(self.mapped_path, self.path)
+        if index is None:
+            source = source_key(self.path)
+            write_mapped_catalog(self._ingest(), self.mapped_path, source)
+            index = MappedIndex(self.mapped_path)
+        else:
+            self.report = IngestionReport(self.max_reported_errors)
+            self.report.loaded = len(index.ids)
+        return index
+
+    def _ingest(self) -> CatalogIndex | ColumnarIndex:
+        """Stream the products file into an index of products."""
+        if self.storage in ("columnar", "mapped"):
+            index = ColumnarIndex()
+        elif self.storage == "objects":
+            index = CatalogIndex()
+        else:
+            raise ConfigFileError(f"Unknown catalog storage: {self.storage}")
+
+        with self.path.open("r", newline="") as csv_file:
+            report = ingest(csv_file, index, self.chunk_size, self.max_reported_errors)
+
+        self.report = report
+        if report.ok:
+            logger.debug(f"{report.loaded} products have been loaded from {self.path.name}.")
+        else:
+            logger.critical(f"{self.path.name} has invalid rows. {report.summary()}")
+        return index
+
+
+catalog = Catalog()
+Product.catalog = catalog
@@ -0,0 +1,278 @@
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, NoReturn, Optional
+from shop.models.products import Product
+from shop.utils.funcs import format_price
+
+
+def stable_hash(value: Hashable) -> int:
+    """Hash a name or ID the same way in every process, unlike the salted built-in hash of strings."""
+    if isinstance(value, int) and -(2 ** 63) <= value < 2 ** 63:
+        data = value.to_bytes(8, "little", signed=True)
+    else:
+        data = str(value).encode()
+    return zlib.crc32(data)
+
+
+class RowTable:
+    """
+    Open-addressing hash table of row numbers, keyed by a value of the row.
+
+    Only row numbers are stored, in a single array of 4-byte integers, so a key
+    costs a few slots of 4 bytes instead of a dictionary entry and a Python object.
+
+    Attributes:
+        key (Callable[[int], Hashable]): Returns the key of a row.
+        hash (Callable[[Hashable], int]): Hashes a key. Must be stable across processes if the slots are shared.
+        slots (array): The row of each slot, or EMPTY. Its length is a power of two.
+        count (int): Number of occupied slots.
+    """
+
+    EMPTY = -1
+
+    def __init__(
+        self,
+        key: Callable[[int], Hashable],
+        hash: Callable[[Hashable], int] = hash,
+        slots: Optional[Sequence[int]] = None,
+        count: int = 0,
+    ) -> NoReturn:
+        """
+        Initializes a table, empty unless existing slots are given.
+
+        Args:
+            key (Callable[[int], Hashable]): Returns the key of a row.
+            hash (Callable[[Hashable], int], optional): Hashes a key. Defaults to the built-in hash.
+            slots (Optional[Sequence[int]], optional): Slots of an already built table, e.g. read from a file.
+            count (int, optional): Number of occupied slots of the given slots.
+        """
+        self.key = key
+        self.hash = hash
+        self.slots = slots if slots is not None else array("i", [self.EMPTY]) * 8
+        self.count = count
+
+    def _probe(self, value: Hashable) -> int:
+        """Return the slot holding the row with the given key, or the empty slot it would go to."""
+        mask = len(self.slots) - 1
+        slot = self.hash(value) & mask
+        while True:
+            row = self.slots[slot]
+            if row == self.EMPTY or self.key(row) == value:
+                return slot
+            slot = (slot + 1) & mask
+
+    def find(self, value: Hashable) -> int:
+        """Return the row with the given key, or EMPTY if there is none."""
+        return self.slots[self._probe(value)]
+
+    def insert(self, row: int) -> NoReturn:
+        """Insert a row, replacing the row with the same key if there is one."""
+        if (self.count + 1) * 2 > len(self.slots):
+            self._grow()
+
+        slot = self._probe(self.key(row))
+        if self.slots[slot] == self.EMPTY:
+            self.count += 1
+        self.slots[slot] = row
+
+    def _grow(self) -> NoReturn:
+        """Double the number of slots and re-insert every row."""
+        old_slots = self.slots
+        self.slots = array("i", [self.EMPTY]) * (len(old_slots) * 2)
+        self.count = 0
+        for row in old_slots:
+            if row != self.EMPTY:
+                self.insert(row)
+
+
+class ProductColumns(Sequence):
+    """The products of a columnar index, in file order. Products are materialised on access."""
+
+    def __init__(self, index: "ColumnarIndex") -> NoReturn:
+        """Initializes a view of the products of the index."""
+        self.index = index
+
+    def __len__(self) -> int:
+        """Return the number of products."""
+        return len(self.index.ids)
+
+    def __getitem__(self, position):
+        """Return the product at a position, or a list of the products of a slice."""
+        if isinstance(position, slice):
+            return [self.index.product(row) for row in range(len(self))[position]]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("product index out of range")
+        return self.index.product(position)
+
+
+class ProductLookup(Mapping):
+    """Products of a columnar index keyed by one of their columns, backed by a RowTable."""
+
+    def __init__(self, index: "ColumnarIndex", table: RowTable) -> NoReturn:
+        """Initializes a view of the products of the index, keyed by the table."""
+        self.index = index
+        self.table = table
+
+    def __getitem__(self, key: Hashable) -> Product:
+        """Return the product with the given key."""
+        row = self.table.find(key)
+        if row == RowTable.EMPTY:
+            raise KeyError(key)
+        return self.index.product(row)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return True if a product has the given key, without materialising it."""
+        return self.table.find(key) != RowTable.EMPTY
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over the keys, in file order."""
+        for row in range(len(self.index.ids)):
+            yield self.table.key(row)
+
+    def __len__(self) -> int:
+        """Return the number of keys."""
+        return self.table.count
+
+
+class CategoryLookup(Mapping):
+    """Products of a columnar index grouped by category, materialised on access."""
+
+    def __init__(self, index: "ColumnarIndex") -> NoReturn:
+        """Initializes a view of the categories of the index."""
+        self.index = index
+
+    def __getitem__(self, category: str) -> List[Product]:
+        """Return the products of the category."""
+        code = self.index.category_codes.get(category)
+        if code is None:
+            raise KeyError(category)
+        return [self.index.product(row) for row in self.index.category_rows[code]]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the category names."""
+        return iter(self.index.categories)
+
+    def __len__(self) -> int:
+        """Return the number of categories."""
+        return len(self.index.categories)
+
+
+class ColumnarIndex:
+    """
+    A memory-compact alternative to CatalogIndex that keeps products in columns.
+
+    IDs, prices in cents and quantities are contiguous arrays. Names are UTF-8
+    encoded into one buffer with an offsets array, and categories are
+    dictionary-encoded into small integer codes. Lookups by name and ID go
+    through open-addressing tables of row numbers. A Product is only built
+    when one is accessed, so the index holds no per-product Python objects.
+
+    It offers the same `products`, `by_name`, `by_id`, `by_category` and `add`
+    interface as CatalogIndex. Price texts are rebuilt from the cents. Unlike
+    CatalogIndex, `add` rejects values that don't fit the type of their column.
+
+    Attributes:
+        ids (array): Product IDs.
+        prices (array): Product prices in cents.
+        quantities (array): Product quantities.
+        codes (array): Category code of each product.
+        categories (List[str]): Category names, indexed by code.
+        category_codes (Dict[str, int]): Category codes, keyed by name.
+        category_rows (List[array]): Rows of each category, indexed by code.
+    """
+
+    # Bounds of the values of the integer columns, from the sizes of their array types.
+    MAX_ID = 2 ** 63 - 1
+    MAX_PRICE_CENTS = 2 ** 63 - 1
+    MAX_QUANTITY = 2 ** 31 - 1
+
+    def __init__(self, products: Iterable[Product] = ()) -> NoReturn:
+        """
+        Initializes the index of the given products.
+
+        Args:
+            products (Iterable[Product], optional): The products to index.
+        """
+        self.ids = array("q")
+        self.prices = array("q")
+        self.quantities = array("i")
+        self.codes = array("I")
+        self.categories: List[str] = list()
+        self.category_codes: Dict[str, int] = dict()
+        self.category_rows: List[array] = list()
+        self._names = bytearray()
+        self._name_offsets = array("I", [0])
+
+        # Tables are pickled into the catalog snapshot, so their slots must not depend on the hash seed.
+        self._name_table = RowTable(self.name, hash=stable_hash)
+        self._id_table = RowTable(self.ids.__getitem__, hash=stable_hash)
+
+        self.products = ProductColumns(self)
+        self.by_name = ProductLookup(self, self._name_table)
+        self.by_id = ProductLookup(self, self._id_table)
+        self.by_category = CategoryLookup(self)
+
+        for product in products:
+            self.add(product)
+
+    def name(self, row: int) -> str:
+        """Return the name of the product in the given row."""
+        offsets = self._name_offsets
+        return str(self._names[offsets[row]:offsets[row + 1]], "utf-8")
+
+    def product(self, row: int) -> Product:
+        """Materialise the product in the given row."""
+        price_cents = self.prices[row]
+        return Product(
+            self.ids[row],
+            self.name(row),
+            format_price(price_cents),
+            self.categories[self.codes[row]],
+            self.quantities[row],
+            price_cents,
+        )
+
+    def check(self, product: Product) -> NoReturn:
+        """
+        Check that the values of a product fit their columns.
+
+        Raises:
+            ValueError: If the ID, price or quantity is out of the range of its column.
+        """
+        if not -self.MAX_ID - 1 <= product.id <= self.MAX_ID:
+            raise ValueError(f"id {product.id} is out of range")
+        if not -self.MAX_PRICE_CENTS - 1 <= product.price_cents <= self.MAX_PRICE_CENTS:
+            raise ValueError(f"price {product.price} is out of range")
+        if not -self.MAX_QUANTITY - 1 <= product.quantity <= self.MAX_QUANTITY:
+            raise ValueError(f"quantity {product.quantity} is out of range")
+
+    def add(self, product: Product) -> NoReturn:
+        """
+        Append a product to the columns and to every lookup table.
+
+        Raises:
+            ValueError: If a value of the product doesn't fit its column. Nothing is added then.
+        """
+        self.check(product)
+        row = len(self.ids)
+
+        code = self.category_codes.get(product.category)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(product.category)
+            self.category_codes[product.category] = code
+            self.category_rows.append(array("I"))
+
+        self.ids.append(product.id)
+        self.prices.append(product.price_cents)
+        self.quantities.append(product.quantity)
+        self.codes.append(code)
+        self.category_rows[code].append(row)
+        self._names += product.name.encode()
+        self._name_offsets.append(len(self._names))
+
+        self._name_table.insert(row)
+        self._id_table.insert(row)
@@ -0,0 +1,144 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from typing import Dict, List, NoReturn, Optional, Tuple
+
+
+class PriceOrder:
+    """
+    Positions of a group of products sorted by price, with their prices alongside for bisecting.
+
+    Attributes:
+        positions (array): Catalog positions of the products, cheapest first.
+        prices (array): Prices in cents of the products, in the same order.
+    """
+
+    def __init__(self) -> NoReturn:
+        """Initializes an empty group."""
+        self.positions = array("I")
+        self.prices = array("q")
+
+    def bounds(self, min_cents: Optional[int], max_cents: Optional[int]) -> Tuple[int, int]:
+        """Return the range of the group whose prices are within the bounds, in O(log n)."""
+        low = 0 if min_cents is None else bisect_left(self.prices, min_cents)
+        high = len(self.prices) if max_cents is None else bisect_right(self.prices, max_cents)
+        return low, max(low, high)
+
+
+class FacetView(Sequence):
+    """
+    The products of a range of a PriceOrder. Nothing is copied; products are materialised on access.
+
+    Attributes:
+        products (Sequence[Product]): The products of the catalog, by position.
+        order (PriceOrder): The price-sorted group the range belongs to.
+        low (int): Start of the range.
+        high (int): End of the range.
+        descending (bool): Whether the most expensive product comes first.
+    """
+
+    def __init__(
+        self,
+        products: Sequence,
+        order: PriceOrder,
+        low: int,
+        high: int,
+        descending: bool = False,
+    ) -> NoReturn:
+        """Initializes a view of the range [low, high) of the group."""
+        self.products = products
+        self.order = order
+        self.low = low
+        self.high = high
+        self.descending = descending
+
+    def __len__(self) -> int:
+        """Return the number of products in the range."""
+        return self.high - self.low
+
+    def _position(self, number: int) -> int:
+        """Return the catalog position of the product at the given place of the view."""
+        if self.descending:
+            return self.order.positions[self.high - 1 - number]
+        return self.order.positions[self.low + number]
+
+    def __getitem__(self, number):
+        """Return the product at a place of the view, or a list of the products of a slice."""
+        if isinstance(number, slice):
+            return [self.products[self._position(place)] for place in range(len(self))[number]]
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError("product index out of range")
+        return self.products[self._position(number)]
+
+
+class CatalogFacets:
+    """
+    Precomputed orderings of the catalog for filtered, price-sorted browsing.
+
+    Every product is placed, by price, in the ordering of all products and of
+    its category, and in the in-stock variants of both. A query picks one of
+    those orderings and bisects it for the price range, so a filtered page
+    costs O(log n + page) whatever the size of the catalog.
+
+    Attributes:
+        products (Sequence[Product]): The products of the catalog, by position.
+    """
+
+    def __init__(self, products: Sequence) -> NoReturn:
+        """
+        Initializes the orderings of the given products.
+
+        Args:
+            products (Sequence[Product]): The products of the catalog, by position.
+        """
+        self.products = products
+        self._orders: Dict[Tuple[Optional[str], bool], PriceOrder] = dict()
+
+        entries = sorted(
+            (product.price_cents, position, product.category, product.quantity > 0)
+            for position, product in enumerate(products)
+        )
+        for price_cents, position, category, in_stock in entries:
+            keys = [(None, False), (category, False)]
+            if in_stock:
+                keys += [(None, True), (category, True)]
+            for key in keys:
+                order = self._orders.get(key)
+                if order is None:
+                    order = self._orders[key] = PriceOrder()
+                order.positions.append(position)
+                order.prices.append(price_cents)
+
+    def browse(
+        self,
+        category: Optional[str] = None,
+        min_cents: Optional[int] = None,
+        max_cents: Optional[int] = None,
+        in_stock: bool = False,
+        descending: bool = False,
+    ) -> FacetView:
+        """
+        Return the products matching the filters, sorted by price.
+
+        Args:
+            category (Optional[str], optional): Only products of this category. Defaults to every category.
+            min_cents (Optional[int], optional): Lowest price in cents. Defaults to no lower bound.
+            max_cents (Optional[int], optional): Highest price in cents. Defaults to no upper bound.
+            in_stock (bool, optional): Only products with a quantity of at least 1. Defaults to False.
+            descending (bool, optional): Most expensive first. Defaults to False.
+
+        Returns:
+            FacetView: The matching products. Its length is known without materialising any product.
+        """
+        order = self._orders.get((category, in_stock))
+        if order is None:
+            order = PriceOrder()
+
+        low, high = order.bounds(min_cents, max_cents)
+        return FacetView(self.products, order, low, high, descending)
+
+    def categories(self) -> List[str]:
+        """Return the categories of the catalog, alphabetically."""
+        return sorted(category for category, in_stock in self._orders if category is not None and not in_stock)
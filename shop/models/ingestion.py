@@ -0,0 +1,182 @@
+import csv
+from collections import namedtuple
+from itertools import islice
+from typing import Iterator, List, NamedTuple, NoReturn, TextIO, Tuple, TYPE_CHECKING
+from shop.models.products import Product, PRODUCT_FIELDS
+from shop.utils.funcs import title_and_strip_names
+from shop.helpers.exceptions import CatalogFileError
+from config.log_config import config_logging
+
+if TYPE_CHECKING:
+    from shop.models.catalog import CatalogIndex
+
+logger = config_logging()
+
+# A rejected row of the products file, with its line number and the reason it was rejected.
+BadRow: NamedTuple = namedtuple("BadRow", ["line", "reason", "row"])
+
+
+class IngestionReport:
+    """
+    The outcome of ingesting a products file.
+
+    Attributes:
+        loaded (int): Number of products added to the catalog.
+        bad_rows (List[BadRow]): The first `max_reported` rejected rows.
+        rejected (int): Number of rejected rows, including the ones not kept in `bad_rows`.
+        max_reported (int): Number of rejected rows kept in `bad_rows`.
+    """
+
+    def __init__(self, max_reported: int = 100) -> NoReturn:
+        """
+        Initializes an empty report.
+
+        Args:
+            max_reported (int, optional): Number of rejected rows kept in `bad_rows`. Defaults to 100.
+        """
+        self.loaded = 0
+        self.bad_rows: List[BadRow] = list()
+        self.rejected = 0
+        self.max_reported = max_reported
+
+    @property
+    def ok(self) -> bool:
+        """Return True if no row has been rejected."""
+        return self.rejected == 0
+
+    def reject(self, line: int, reason: str, row: List[str]) -> NoReturn:
+        """Record a rejected row."""
+        self.rejected += 1
+        if len(self.bad_rows) < self.max_reported:
+            self.bad_rows.append(BadRow(line, reason, row))
+        logger.error(f"Products file line {line} rejected: {reason}")
+
+    def summary(self) -> str:
+        """Return a description of the report, listing the kept rejected rows."""
+        message = f"{self.loaded} products loaded, {self.rejected} rows rejected."
+        for bad_row in self.bad_rows:
+            message += f"\n-line {bad_row.line}: {bad_row.reason}"
+        if self.rejected > len(self.bad_rows):
+            message += f"\n-and {self.rejected - len(self.bad_rows)} more."
+        return message
+
+
+def _column_positions(header: List[str]) -> List[int]:
+    """
+    Return the position of every product field in the header of the products file.
+
+    Raises:
+        CatalogFileError: If a product field has no column.
+    """
+    column_names = [name.strip().lower() for name in header]
+    missing = [field for field in PRODUCT_FIELDS if field not in column_names]
+    if missing:
+        raise CatalogFileError(f"Products file has no {', '.join(missing)} column.")
+
+    return [column_names.index(field) for field in PRODUCT_FIELDS]
+
+
+def _parse_row(row: List[str], positions: List[int], width: int) -> Product:
+    """
+    Validate a row of the products file and build its product.
+
+    Raises:
+        ValueError: If the row is not a valid product.
+    """
+    if len(row) != width:
+        raise ValueError(f"expected {width} columns, got {len(row)}")
+
+    values = title_and_strip_names([row[position] for position in positions])
+    try:
+        product = Product(*values)
+    except (TypeError, ValueError, OverflowError) as error:
+        raise ValueError(str(error))
+
+    if not product.name:
+        raise ValueError("empty name")
+    if product.price_cents < 0:
+        raise ValueError(f"negative price {product.price}")
+    if product.quantity < 0:
+        raise ValueError(f"negative quantity {product.quantity}")
+
+    return product
+
+
+def iter_chunks(
+    csv_file: TextIO, chunk_size: int, report: IngestionReport
+) -> Iterator[List[Tuple[int, Product]]]:
+    """
+    Parse the products file in chunks of at most `chunk_size` rows.
+
+    Only one chunk of rows is held at a time. Invalid rows are recorded in the
+    report and left out of the chunk.
+
+    Yields:
+        List[Tuple[int, Product]]: The line numbers and products of the valid rows of a chunk.
+
+    Raises:
+        CatalogFileError: If the header of the file is missing a product field.
+    """
+    csv_reader = csv.reader(csv_file)
+    header = next(csv_reader, None)
+    if header is None:
+        raise CatalogFileError("Products file is empty.")
+    positions = _column_positions(header)
+
+    while True:
+        rows = list(islice(csv_reader, chunk_size))
+        if not rows:
+            break
+
+        first_line = csv_reader.line_num - len(rows) + 1
+        chunk = list()
+        for line, row in enumerate(rows, start=first_line):
+            if not any(row):
+                continue
+            try:
+                chunk.append((line, _parse_row(row, positions, len(header))))
+            except ValueError as error:
+                report.reject(line, str(error), row)
+
+        yield chunk
+
+
+def ingest(
+    csv_file: TextIO,
+    index: "CatalogIndex",
+    chunk_size: int = 10000,
+    max_reported: int = 100,
+) -> IngestionReport:
+    """
+    Stream the products file into the index, one chunk at a time.
+
+    Products whose ID or name is already in the index, or that the index
+    refuses to add, are rejected.
+
+    Args:
+        csv_file (TextIO): The products CSV file.
+        index (CatalogIndex): The index the products are added to.
+        chunk_size (int, optional): Number of rows parsed at a time. Defaults to 10000.
+        max_reported (int, optional): Number of rejected rows kept in the report. Defaults to 100.
+
+    Returns:
+        IngestionReport: The number of loaded products and the rejected rows.
+    """
+    report = IngestionReport(max_reported)
+
+    for chunk in iter_chunks(csv_file, chunk_size, report):
+        for line, product in chunk:
+            if product.id in index.by_id:
+                report.reject(line, f"duplicate id {product.id}", list(map(str, product[:5])))
+            elif product.name in index.by_name:
+                report.reject(line, f"duplicate name {product.name}", list(map(str, product[:5])))
+            else:
+                try:
+                    index.add(product)
+                except ValueError as error:
+                    # E.g. a value that doesn't fit a column of a ColumnarIndex.
+                    report.reject(line, str(error), list(map(str, product[:5])))
+                else:
+                    report.loaded += 1
+
+    return report
@@ -0,0 +1,327 @@
+import atexit
+import sqlite3
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Mapping, NoReturn, Optional
+from shop.helpers.exceptions import OutOfStockError
+from config.app_config import get_config, project_path
+from config.database import connect_sqlite
+from config.helpers.exceptions import ConfigFileError
+from config.log_config import config_logging
+
+logger = config_logging()
+
+inventory_config = get_config("shop.inventory")
+
+
+def _out_of_stock(item: Mapping, units: int, available: int) -> OutOfStockError:
+    """Build the error of a reservation the stock can't cover."""
+    if available <= 0:
+        return OutOfStockError(f"{item['name']} is out of stock.")
+    return OutOfStockError(
+        f"Only {available} more {item['name']} can be reserved, {units} were requested."
+    )
+
+
+class Inventory(ABC):
+    """
+    Stock of every product, with the units reserved by each basket.
+
+    The stock of a product starts at the quantity of the catalog the first
+    time it is reserved. Reserved units are taken out of the available stock
+    until they are released back or committed as sold.
+
+    Items are basket lines or Product dicts, with at least an id, a name and a quantity.
+    """
+
+    @abstractmethod
+    def available(self, item: Mapping) -> int:
+        """Return the units of a product that can still be reserved."""
+
+    @abstractmethod
+    def reserve(self, owner: str, item: Mapping, units: int = 1) -> NoReturn:
+        """
+        Reserve units of a product for a basket, atomically.
+
+        Raises:
+            OutOfStockError: If fewer units are available. Nothing is reserved then.
+        """
+
+    @abstractmethod
+    def release(self, owner: str, item: Mapping, units: int = 1) -> NoReturn:
+        """Give units reserved by a basket back to the stock."""
+
+    @abstractmethod
+    def release_all(self, owner: str) -> NoReturn:
+        """Give every unit reserved by a basket back to the stock."""
+
+    @abstractmethod
+    def commit(self, owner: str) -> NoReturn:
+        """Mark every unit reserved by a basket as sold."""
+
+    def close(self) -> NoReturn:
+        """Release the resources of the inventory."""
+
+
+class StripedInventory(Inventory):
+    """
+    Keeps the stock in memory, with per-product counters guarded by striped locks.
+
+    Products are spread over a fixed number of locks by ID, and baskets over
+    another set of locks by owner, so shoppers reserving different products
+    rarely wait on each other and no single lock serialises the whole store.
+    Safe across the threads of one process only.
+
+    Attributes:
+        stripes (int): Number of locks of each set.
+    """
+
+    def __init__(self, stripes: int = 64) -> NoReturn:
+        """
+        Initializes an inventory with no product.
+
+        Args:
+            stripes (int, optional): Number of locks of each set. Defaults to 64.
+        """
+        self.stripes = stripes
+        self._stock_locks = [threading.Lock() for _ in range(stripes)]
+        self._owner_locks = [threading.Lock() for _ in range(stripes)]
+        self._available: Dict[int, int] = dict()
+        self._reservations: Dict[str, Dict[int, int]] = defaultdict(dict)
+
+    def _stock_lock(self, product_id: int) -> threading.Lock:
+        """Return the lock guarding the counter of a product."""
+        return self._stock_locks[product_id % self.stripes]
+
+    def _owner_lock(self, owner: str) -> threading.Lock:
+        """Return the lock guarding the reservations of a basket."""
+        return self._owner_locks[zlib.crc32(owner.encode()) % self.stripes]
+
+    def available(self, item: Mapping) -> int:
+        """Return the units of a product that can still be reserved."""
+        with self._stock_lock(item["id"]):
+            return self._available.get(item["id"], item["quantity"])
+
+    def reserve(self, owner: str, item: Mapping, units: int = 1) -> NoReturn:
+        """
+        Reserve units of a product for a basket, atomically.
+
+        Raises:
+            OutOfStockError: If fewer units are available. Nothing is reserved then.
+        """
+        product_id = item["id"]
+        with self._stock_lock(product_id):
+            available = self._available.get(product_id, item["quantity"])
+            if available < units:
+                raise _out_of_stock(item, units, available)
+            self._available[product_id] = available - units
+
+        with self._owner_lock(owner):
+            reservations = self._reservations[owner]
+            reservations[product_id] = reservations.get(product_id, 0) + units
+
+    def _give_back(self, product_id: int, units: int) -> NoReturn:
+        """Add units back to the counter of a product."""
+        with self._stock_lock(product_id):
+            self._available[product_id] += units
+
+    def release(self, owner: str, item: Mapping, units: int = 1) -> NoReturn:
+        """Give units reserved by a basket back to the stock."""
+        product_id = item["id"]
+        with self._owner_lock(owner):
+            reservations = self._reservations.get(owner, {})
+            units = min(units, reservations.get(product_id, 0))
+            if not units:
+                return
+            reservations[product_id] -= units
+            if not reservations[product_id]:
+                del reservations[product_id]
+            if not reservations:
+                self._reservations.pop(owner, None)
+
+        self._give_back(product_id, units)
+
+    def release_all(self, owner: str) -> NoReturn:
+        """Give every unit reserved by a basket back to the stock."""
+        with self._owner_lock(owner):
+            reservations = self._reservations.pop(owner, {})
+
+        for product_id, units in reservations.items():
+            self._give_back(product_id, units)
+
+    def commit(self, owner: str) -> NoReturn:
+        """Mark every unit reserved by a basket as sold."""
+        with self._owner_lock(owner):
+            reservations = self._reservations.pop(owner, {})
+        logger.info(f"{sum(reservations.values())} reserved units of {owner} have been sold.")
+
+
+class SqliteInventory(Inventory):
+    """
+    Keeps the stock in an SQLite ledger shared by every process of the host.
+
+    A reservation is a single conditional UPDATE of the counter of one product
+    in a short transaction, so two processes can't both take the last unit.
+    Every thread has its own connection, and the database runs in WAL mode so
+    stock can be read while a reservation is being written.
+
+    Attributes:
+        path (Path): The SQLite database file.
+    """
+
+    CREATE_STOCK = """
+        CREATE TABLE IF NOT EXISTS stock (
+            product_id INTEGER PRIMARY KEY,
+            available INTEGER NOT NULL CHECK (available >= 0)
+        )
+    """
+    CREATE_RESERVATIONS = """
+        CREATE TABLE IF NOT EXISTS reservations (
+            owner TEXT NOT NULL,
+            product_id INTEGER NOT NULL,
+            units INTEGER NOT NULL,
+            PRIMARY KEY (owner, product_id)
+        )
+    """
+
+    SEED_STOCK = "INSERT OR IGNORE INTO stock (product_id, available) VALUES (?, ?)"
+    SELECT_AVAILABLE = "SELECT available FROM stock WHERE product_id = ?"
+    TAKE_STOCK = "UPDATE stock SET available = available - ? WHERE product_id = ? AND available >= ?"
+    GIVE_STOCK = "UPDATE stock SET available = available + ? WHERE product_id = ?"
+    ADD_RESERVATION = (
+        "INSERT INTO reservations (owner, product_id, units) VALUES (?, ?, ?) "
+        "ON CONFLICT (owner, product_id) DO UPDATE SET units = units + excluded.units"
+    )
+    SELECT_RESERVATION = "SELECT units FROM reservations WHERE owner = ? AND product_id = ?"
+    SELECT_RESERVATIONS = "SELECT product_id, units FROM reservations WHERE owner = ?"
+    TAKE_RESERVATION = "UPDATE reservations SET units = units - ? WHERE owner = ? AND product_id = ?"
+    DELETE_EMPTY_RESERVATION = "DELETE FROM reservations WHERE owner = ? AND product_id = ? AND units <= 0"
+    DELETE_RESERVATIONS = "DELETE FROM reservations WHERE owner = ?"
+
+    def __init__(self, path: Path) -> NoReturn:
+        """
+        Initializes an SQLite inventory.
+
+        Args:
+            path (Path): The SQLite database file.
+        """
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = list()
+        self._connections_lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get the connection of the current thread, opening and migrating the database on first use."""
+        connection: Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = connect_sqlite(
+                self.path, (self.CREATE_STOCK, self.CREATE_RESERVATIONS), timeout=10.0, isolation_level=None
+            )
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _transaction(self) -> sqlite3.Connection:
+        """Start a write transaction on the connection of the current thread and return it."""
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        return connection
+
+    def available(self, item: Mapping) -> int:
+        """Return the units of a product that can still be reserved."""
+        row = self.connection.execute(self.SELECT_AVAILABLE, (item["id"],)).fetchone()
+        return item["quantity"] if row is None else row[0]
+
+    def reserve(self, owner: str, item: Mapping, units: int = 1) -> NoReturn:
+        """
+        Reserve units of a product for a basket, atomically.
+
+        Raises:
+            OutOfStockError: If fewer units are available. Nothing is reserved then.
+        """
+        product_id = item["id"]
+        connection = self._transaction()
+        try:
+            connection.execute(self.SEED_STOCK, (product_id, item["quantity"]))
+            taken = connection.execute(self.TAKE_STOCK, (units, product_id, units)).rowcount
+            if not taken:
+                (available,) = connection.execute(self.SELECT_AVAILABLE, (product_id,)).fetchone()
+                connection.execute("ROLLBACK")
+                raise _out_of_stock(item, units, available)
+            connection.execute(self.ADD_RESERVATION, (owner, product_id, units))
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+
+    def release(self, owner: str, item: Mapping, units: int = 1) -> NoReturn:
+        """Give units reserved by a basket back to the stock."""
+        product_id = item["id"]
+        connection = self._transaction()
+        try:
+            row = connection.execute(self.SELECT_RESERVATION, (owner, product_id)).fetchone()
+            units = min(units, row[0] if row else 0)
+            if units:
+                connection.execute(self.TAKE_RESERVATION, (units, owner, product_id))
+                connection.execute(self.DELETE_EMPTY_RESERVATION, (owner, product_id))
+                connection.execute(self.GIVE_STOCK, (units, product_id))
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+
+    def release_all(self, owner: str) -> NoReturn:
+        """Give every unit reserved by a basket back to the stock."""
+        connection = self._transaction()
+        try:
+            reservations = connection.execute(self.SELECT_RESERVATIONS, (owner,)).fetchall()
+            connection.executemany(
+                self.GIVE_STOCK, ((units, product_id) for product_id, units in reservations)
+            )
+            connection.execute(self.DELETE_RESERVATIONS, (owner,))
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+
+    def commit(self, owner: str) -> NoReturn:
+        """Mark every unit reserved by a basket as sold."""
+        connection = self._transaction()
+        try:
+            reservations = connection.execute(self.SELECT_RESERVATIONS, (owner,)).fetchall()
+            connection.execute(self.DELETE_RESERVATIONS, (owner,))
+            connection.execute("COMMIT")
+        except sqlite3.Error:
+            connection.execute("ROLLBACK")
+            raise
+        logger.info(f"{sum(units for _, units in reservations)} reserved units of {owner} have been sold.")
+
+    def close(self) -> NoReturn:
+        """Close the connections of every thread."""
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+def create_inventory() -> Inventory:
+    """Create the inventory selected by the "shop.inventory" section of the app config."""
+    backend = inventory_config.get("backend", "memory")
+    if backend == "memory":
+        return StripedInventory(inventory_config.get("stripes", 64))
+    elif backend == "sqlite":
+        return SqliteInventory(
+            project_path(inventory_config.get("sqlite_path", "shop/models/inventory.sqlite3"))
+        )
+    else:
+        raise ConfigFileError(f"Unknown inventory backend: {backend}")
+
+
+inventory = create_inventory()
+atexit.register(inventory.close)
@@ -0,0 +1,247 @@
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, NoReturn, Optional
+from shop.models.columnar import (
+    CategoryLookup,
+    ColumnarIndex,
+    ProductColumns,
+    ProductLookup,
+    RowTable,
+    stable_hash,
+)
+from shop.models.snapshot import source_key
+from shop.helpers.exceptions import CatalogFileError
+from config.log_config import config_logging
+
+logger = config_logging()
+
+MAGIC = b"SHOPCAT\0"
+# Bumped whenever the layout of the file changes.
+MAPPED_VERSION = 1
+
+# Sections of the file, in order, with the array type code of their items ("B" for raw bytes).
+SECTIONS = [
+    ("ids", "q"),
+    ("prices", "q"),
+    ("quantities", "i"),
+    ("codes", "I"),
+    ("name_offsets", "I"),
+    ("names", "B"),
+    ("category_offsets", "I"),
+    ("category_names", "B"),
+    ("category_row_offsets", "I"),
+    ("category_rows", "I"),
+    ("name_slots", "i"),
+    ("id_slots", "i"),
+]
+
+# magic, version, products, categories, name table count, source mtime_ns, source size, source sha256.
+HEADER = struct.Struct("<8sIIII QQ32s")
+SECTION_ENTRY = struct.Struct("<QQ")
+ALIGNMENT = 8
+
+
+def _build_slots(key, rows: int) -> RowTable:
+    """Build a RowTable of every row with the stable hash."""
+    table = RowTable(key, hash=stable_hash)
+    for row in range(rows):
+        table.insert(row)
+    return table
+
+
+def write_mapped_catalog(
+    index: ColumnarIndex, path: Path, source: Dict[str, Any]
+) -> NoReturn:
+    """
+    Write a columnar index to a file that MappedIndex can map.
+
+    The file is written next to its final path and moved into place, so
+    processes that have the previous version mapped keep reading it safely.
+
+    Args:
+        index (ColumnarIndex): The loaded index.
+        path (Path): The mapped catalog file.
+        source (Dict[str, Any]): The source_key of the products file, taken before it was read.
+    """
+    count = len(index.ids)
+    category_names = [category.encode() for category in index.categories]
+
+    category_offsets = array("I", [0])
+    for name in category_names:
+        category_offsets.append(category_offsets[-1] + len(name))
+
+    category_row_offsets = array("I", [0])
+    category_rows = array("I")
+    for rows in index.category_rows:
+        category_rows.extend(rows)
+        category_row_offsets.append(len(category_rows))
+
+    name_table = _build_slots(index.name, count)
+    id_table = _build_slots(index.ids.__getitem__, count)
+
+    sections = {
+        "ids": index.ids,
+        "prices": index.prices,
+        "quantities": index.quantities,
+        "codes": index.codes,
+        "name_offsets": index._name_offsets,
+        "names": bytes(index._names),
+        "category_offsets": category_offsets,
+        "category_names": b"".join(category_names),
+        "category_row_offsets": category_row_offsets,
+        "category_rows": category_rows,
+        "name_slots": name_table.slots,
+        "id_slots": id_table.slots,
+    }
+
+    header = HEADER.pack(
+        MAGIC,
+        MAPPED_VERSION,
+        count,
+        len(index.categories),
+        name_table.count,
+        source["mtime_ns"],
+        source["size"],
+        bytes.fromhex(source["sha256"]),
+    )
+
+    # Workers building the file at the same time each write their own temporary file.
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with temporary.open("wb") as mapped_file:
+        position = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+        entries = list()
+        payloads = list()
+        for name, _ in SECTIONS:
+            data = bytes(sections[name])
+            position += -position % ALIGNMENT
+            entries.append(SECTION_ENTRY.pack(position, len(data)))
+            payloads.append((position, data))
+            position += len(data)
+
+        mapped_file.write(header)
+        mapped_file.write(b"".join(entries))
+        for offset, data in payloads:
+            mapped_file.write(b"\0" * (offset - mapped_file.tell()))
+            mapped_file.write(data)
+
+        mapped_file.flush()
+        os.fsync(mapped_file.fileno())
+    os.replace(temporary, path)
+    logger.debug(f"Mapped catalog {path.name} has been written with {count} products.")
+
+
+class MappedIndex(ColumnarIndex):
+    """
+    A read-only ColumnarIndex whose columns live in a memory-mapped file.
+
+    The columns and lookup tables are memoryviews of the mapping, so opening
+    the file copies nothing and products are decoded from the buffer only when
+    accessed. Every process that maps the same file shares its pages through the
+    OS page cache, so memory per worker stays flat as workers are added.
+
+    Attributes:
+        path (Path): The mapped catalog file.
+        source (Dict[str, Any]): The mtime_ns, size and sha256 of the products file it was built from.
+    """
+
+    def __init__(self, path: Path) -> NoReturn:
+        """
+        Maps the catalog file.
+
+        Args:
+            path (Path): The mapped catalog file.
+
+        Raises:
+            CatalogFileError: If the file is not a mapped catalog of the current version.
+        """
+        self.path = path
+        with path.open("rb") as mapped_file:
+            self._mmap = mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        if len(buffer) < HEADER.size:
+            raise CatalogFileError(f"{path.name} is not a mapped catalog.")
+
+        magic, version, count, categories, name_count, mtime_ns, size, sha256 = (
+            HEADER.unpack_from(buffer)
+        )
+        if magic != MAGIC or version != MAPPED_VERSION:
+            raise CatalogFileError(f"{path.name} is not a mapped catalog of version {MAPPED_VERSION}.")
+        self.source = {"mtime_ns": mtime_ns, "size": size, "sha256": sha256.hex()}
+
+        sections = dict()
+        for number, (name, type_code) in enumerate(SECTIONS):
+            offset, length = SECTION_ENTRY.unpack_from(
+                buffer, HEADER.size + SECTION_ENTRY.size * number
+            )
+            section = buffer[offset:offset + length]
+            sections[name] = section if type_code == "B" else section.cast(type_code)
+
+        self.ids = sections["ids"]
+        self.prices = sections["prices"]
+        self.quantities = sections["quantities"]
+        self.codes = sections["codes"]
+        self._name_offsets = sections["name_offsets"]
+        self._names = sections["names"]
+
+        category_offsets = sections["category_offsets"]
+        category_names = sections["category_names"]
+        self.categories: List[str] = [
+            str(category_names[category_offsets[code]:category_offsets[code + 1]], "utf-8")
+            for code in range(categories)
+        ]
+        self.category_codes = {category: code for code, category in enumerate(self.categories)}
+
+        category_row_offsets = sections["category_row_offsets"]
+        category_rows = sections["category_rows"]
+        self.category_rows = [
+            category_rows[category_row_offsets[code]:category_row_offsets[code + 1]]
+            for code in range(categories)
+        ]
+
+        self._name_table = RowTable(
+            self.name, hash=stable_hash, slots=sections["name_slots"], count=name_count
+        )
+        self._id_table = RowTable(
+            self.ids.__getitem__, hash=stable_hash, slots=sections["id_slots"], count=count
+        )
+
+        self.products = ProductColumns(self)
+        self.by_name = ProductLookup(self, self._name_table)
+        self.by_id = ProductLookup(self, self._id_table)
+        self.by_category = CategoryLookup(self)
+
+    @classmethod
+    def open_if_current(cls, path: Path, csv_path: Path) -> Optional["MappedIndex"]:
+        """
+        Map the catalog file if it was built from the current products file.
+
+        Returns:
+            Optional[MappedIndex]: The mapped index, or None if the file is missing, invalid or stale.
+        """
+        try:
+            index = cls(path)
+        except FileNotFoundError:
+            return None
+        except (CatalogFileError, ValueError, struct.error) as error:
+            logger.error(f"Mapped catalog {path.name} is unreadable: {error}")
+            return None
+
+        current = source_key(csv_path, with_hash=False)
+        if (current["mtime_ns"], current["size"]) == (index.source["mtime_ns"], index.source["size"]):
+            return index
+        if current["size"] == index.source["size"] and source_key(csv_path)["sha256"] == index.source["sha256"]:
+            return index
+        return None
+
+    def add(self, product) -> NoReturn:
+        """
+        Mapped catalogs are read-only.
+
+        Raises:
+            CatalogFileError: Always. Add products to the products file and reload instead.
+        """
+        raise CatalogFileError("The mapped catalog is read-only. Add products to the products file and reload.")
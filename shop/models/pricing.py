@@ -0,0 +1,222 @@
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, NamedTuple, NoReturn, Optional, Tuple
+from config.app_config import get_config
+from config.helpers.exceptions import ConfigFileError
+from config.log_config import config_logging
+
+logger = config_logging()
+
+pricing_config = get_config("shop.pricing")
+
+# Prices of a basket after discounts and tax, in dollars.
+Quote: NamedTuple = namedtuple("Quote", ["subtotal", "discount", "tax", "total"])
+
+
+def parse_rate(value: Any, name: str) -> Decimal:
+    """
+    Parse a rate of the pricing config, such as "0.09", into a Decimal between 0 and 1.
+
+    Raises:
+        ConfigFileError: If the rate is not a number between 0 and 1.
+    """
+    try:
+        rate = Decimal(str(value))
+    except InvalidOperation:
+        raise ConfigFileError(f"Invalid rate for {name}: {value!r}")
+    if not 0 <= rate <= 1:
+        raise ConfigFileError(f"Rate for {name} must be between 0 and 1, got {value!r}")
+    return rate
+
+
+def apply_rate(cents: int, rate: Decimal) -> int:
+    """Return a rate of an amount in cents, rounded half up to the cent."""
+    return int((cents * rate).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+class PricingRules:
+    """
+    The pricing rules of the store, compiled into lookup tables.
+
+    Attributes:
+        default_tax_rate (Decimal): Tax rate of categories without a rate of their own.
+        tax_rates (Dict[str, Decimal]): Tax rate of each category.
+        product_promotions (Dict[str, Decimal]): Discount rate of each promoted product.
+        category_promotions (Dict[str, Decimal]): Discount rate of each promoted category.
+        bulk_units (List[int]): Minimum units of each bulk discount tier, ascending.
+        bulk_rates (List[Decimal]): Discount rate of each bulk discount tier.
+        premium_discount (Decimal): Discount rate of premium users.
+    """
+
+    def __init__(
+        self,
+        default_tax_rate: Decimal = Decimal("0.09"),
+        tax_rates: Optional[Dict[str, Decimal]] = None,
+        product_promotions: Optional[Dict[str, Decimal]] = None,
+        category_promotions: Optional[Dict[str, Decimal]] = None,
+        bulk_discounts: Iterable[Tuple[int, Decimal]] = (),
+        premium_discount: Decimal = Decimal("0"),
+    ) -> NoReturn:
+        """
+        Initializes the rules.
+
+        Args:
+            default_tax_rate (Decimal, optional): Tax rate of categories without a rate of their own. Defaults to 9%.
+            tax_rates (Dict[str, Decimal], optional): Tax rate of each category.
+            product_promotions (Dict[str, Decimal], optional): Discount rate of each promoted product.
+            category_promotions (Dict[str, Decimal], optional): Discount rate of each promoted category.
+            bulk_discounts (Iterable[Tuple[int, Decimal]], optional): Minimum units and discount rate of each bulk discount tier.
+            premium_discount (Decimal, optional): Discount rate of premium users. Defaults to 0.
+        """
+        self.default_tax_rate = default_tax_rate
+        self.tax_rates = tax_rates or dict()
+        self.product_promotions = product_promotions or dict()
+        self.category_promotions = category_promotions or dict()
+
+        tiers = sorted(bulk_discounts)
+        self.bulk_units: List[int] = [units for units, _ in tiers]
+        self.bulk_rates: List[Decimal] = [rate for _, rate in tiers]
+        self.premium_discount = premium_discount
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PricingRules":
+        """
+        Compile the rules of the "shop.pricing" section of the app config.
+
+        Raises:
+            ConfigFileError: If a rate or bulk discount tier is invalid.
+        """
+        bulk_discounts = list()
+        for tier in config.get("bulk_discounts", []):
+            min_units = tier.get("min_units")
+            if not isinstance(min_units, int) or min_units < 1:
+                raise ConfigFileError(f"Invalid min_units of bulk discount: {min_units!r}")
+            bulk_discounts.append((min_units, parse_rate(tier.get("rate"), f"{min_units} units")))
+
+        return cls(
+            default_tax_rate=parse_rate(config.get("default_tax_rate", "0.09"), "default_tax_rate"),
+            tax_rates={
+                category: parse_rate(rate, category)
+                for category, rate in config.get("tax_rates", {}).items()
+            },
+            product_promotions={
+                name: parse_rate(rate, name)
+                for name, rate in config.get("product_promotions", {}).items()
+            },
+            category_promotions={
+                category: parse_rate(rate, category)
+                for category, rate in config.get("category_promotions", {}).items()
+            },
+            bulk_discounts=bulk_discounts,
+            premium_discount=parse_rate(config.get("premium_discount", "0"), "premium_discount"),
+        )
+
+    def discount_rate(self, name: str, category: str, units: int) -> Decimal:
+        """
+        Return the discount rate of a line: its promotion or its bulk discount, whichever is larger.
+
+        A product promotion takes precedence over the promotion of its category.
+        """
+        promotion = self.product_promotions.get(name)
+        if promotion is None:
+            promotion = self.category_promotions.get(category, Decimal("0"))
+
+        tier = bisect_right(self.bulk_units, units)
+        bulk_discount = self.bulk_rates[tier - 1] if tier else Decimal("0")
+
+        return max(promotion, bulk_discount)
+
+    def tax_rate(self, category: str) -> Decimal:
+        """Return the tax rate of a category."""
+        return self.tax_rates.get(category, self.default_tax_rate)
+
+
+class PricingEngine:
+    """
+    Prices basket lines with PricingRules.
+
+    The lines are priced in integer cents. Every line gets its promotion or
+    bulk discount, then the premium discount if the user is premium. Net
+    amounts are summed per tax rate and each sum is taxed once, so a basket
+    with a single tax rate is taxed exactly like its total. Since a quote only
+    needs these sums, a basket can keep them up to date line by line with
+    `price_line` and get its quote from `totals` without walking its lines.
+
+    Attributes:
+        rules (PricingRules): The pricing rules.
+    """
+
+    def __init__(self, rules: PricingRules) -> NoReturn:
+        """
+        Initializes an engine with the given rules.
+
+        Args:
+            rules (PricingRules): The pricing rules.
+        """
+        self.rules = rules
+
+    def price_line(self, item: dict, is_premium: bool = False) -> Tuple[int, int, Decimal]:
+        """
+        Price one basket line.
+
+        Args:
+            item (dict): The basket line, with its name, category, price_cents and unit.
+            is_premium (bool, optional): Whether the user has a premium account. Defaults to False.
+
+        Returns:
+            Tuple[int, int, Decimal]: The amount and discount of the line in cents, and its tax rate.
+        """
+        rules = self.rules
+        amount = item["price_cents"] * item["unit"]
+        discount = apply_rate(amount, rules.discount_rate(item["name"], item["category"], item["unit"]))
+        if is_premium:
+            discount += apply_rate(amount - discount, rules.premium_discount)
+
+        return amount, discount, rules.tax_rate(item["category"])
+
+    def totals(self, subtotal: int, discount: int, net_by_tax_rate: Dict[Decimal, int]) -> Quote:
+        """
+        Build the quote of priced lines from their sums, taxing the net amount of each tax rate once.
+
+        Args:
+            subtotal (int): The sum of the amounts of the lines, in cents.
+            discount (int): The sum of the discounts of the lines, in cents.
+            net_by_tax_rate (Dict[Decimal, int]): The sum of the net amounts of the lines of each tax rate, in cents.
+
+        Returns:
+            Quote: The subtotal, discounts, tax and total, in dollars.
+        """
+        tax = sum(apply_rate(net, rate) for rate, net in net_by_tax_rate.items())
+
+        return Quote(
+            subtotal=Decimal(subtotal).scaleb(-2),
+            discount=Decimal(discount).scaleb(-2),
+            tax=Decimal(tax).scaleb(-2),
+            total=Decimal(subtotal - discount + tax).scaleb(-2),
+        )
+
+    def quote(self, lines: Iterable[dict], is_premium: bool = False) -> Quote:
+        """
+        Price basket lines.
+
+        Args:
+            lines (Iterable[dict]): The basket lines, with their name, category, price_cents and unit.
+            is_premium (bool, optional): Whether the user has a premium account. Defaults to False.
+
+        Returns:
+            Quote: The subtotal, discounts, tax and total, in dollars.
+        """
+        subtotal = discount = 0
+        net_by_tax_rate: Dict[Decimal, int] = defaultdict(int)
+
+        for item in lines:
+            amount, line_discount, tax_rate = self.price_line(item, is_premium)
+            subtotal += amount
+            discount += line_discount
+            net_by_tax_rate[tax_rate] += amount - line_discount
+
+        return self.totals(subtotal, discount, net_by_tax_rate)
+
+
+pricing_engine = PricingEngine(PricingRules.from_config(pricing_config))
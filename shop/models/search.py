@@ -0,0 +1,189 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, NoReturn, Optional
+
+
+def trigrams(text: str) -> List[str]:
+    """Return the trigrams of a padded, lowercased text, so that the start of the text has its own trigrams."""
+    padded = f"  {text.lower()} "
+    return [padded[position:position + 3] for position in range(len(padded) - 2)]
+
+
+def edit_distance(first: str, second: str, limit: int) -> int:
+    """
+    Return the Levenshtein distance between two texts, or limit + 1 once it is known to exceed the limit.
+
+    Only the diagonal band of width 2 * limit + 1 is computed, since cells
+    outside it can't lead to a distance within the limit.
+
+    Args:
+        first (str): A text.
+        second (str): Another text.
+        limit (int): The largest distance of interest.
+
+    Returns:
+        int: The edit distance, capped at limit + 1.
+    """
+    over = limit + 1
+    if abs(len(first) - len(second)) > limit:
+        return over
+
+    previous = [column if column <= limit else over for column in range(len(second) + 1)]
+    for row, first_char in enumerate(first, start=1):
+        start = max(1, row - limit)
+        end = min(len(second), row + limit)
+        current = [over] * (len(second) + 1)
+        current[0] = row if row <= limit else over
+
+        best = current[0]
+        for column in range(start, end + 1):
+            cost = previous[column - 1] + (first_char != second[column - 1])
+            cost = min(cost, previous[column] + 1, current[column - 1] + 1, over)
+            current[column] = cost
+            if cost < best:
+                best = cost
+
+        if best > limit:
+            return over
+        previous = current
+
+    return previous[-1]
+
+
+class CatalogSearch:
+    """
+    Prefix and typo-tolerant search over the product names of the catalog.
+
+    Built once from the product names. Prefix lookups bisect a sorted array of
+    lowercased names. Fuzzy lookups gather candidates sharing trigrams with the
+    query from an inverted trigram index, keep the ones sharing the most, and
+    rank them by edit distance. Trigrams found in more than `max_postings` names
+    are skipped, so a lookup never walks most of the catalog. A query made only
+    of such common trigrams falls back to the prefix lookup.
+
+    Attributes:
+        names (List[str]): The product names, in catalog order.
+        max_postings (int): Trigrams found in more names than this are skipped.
+        max_candidates (int): Number of fuzzy candidates ranked by edit distance.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str],
+        max_postings: int = 1000,
+        max_candidates: int = 20,
+    ) -> NoReturn:
+        """
+        Initializes the search index of the given names.
+
+        Args:
+            names (Iterable[str]): The product names.
+            max_postings (int, optional): Trigrams found in more names than this are skipped. Defaults to 1000.
+            max_candidates (int, optional): Number of fuzzy candidates ranked by edit distance. Defaults to 20.
+        """
+        self.names: List[str] = list(names)
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+
+        lowered = [name.lower() for name in self.names]
+        self._order = array("I", sorted(range(len(lowered)), key=lowered.__getitem__))
+        self._sorted = [lowered[position] for position in self._order]
+
+        self._postings: Dict[str, array] = dict()
+        for position, name in enumerate(lowered):
+            for trigram in set(trigrams(name)):
+                postings = self._postings.get(trigram)
+                if postings is None:
+                    postings = self._postings[trigram] = array("I")
+                postings.append(position)
+
+    def prefix(self, prefix: str, limit: int = 5) -> List[str]:
+        """
+        Return the names starting with the prefix, case-insensitively, in alphabetical order.
+
+        Args:
+            prefix (str): The start of a product name.
+            limit (int, optional): Maximum number of names returned. Defaults to 5.
+
+        Returns:
+            List[str]: The matching names.
+        """
+        prefix = prefix.lower().strip()
+        if not prefix:
+            return []
+
+        matches = list()
+        position = bisect_left(self._sorted, prefix)
+        while position < len(self._sorted) and len(matches) < limit and self._sorted[position].startswith(prefix):
+            matches.append(self.names[self._order[position]])
+            position += 1
+
+        return matches
+
+    def fuzzy(self, query: str, limit: int = 5, max_distance: Optional[int] = None) -> List[str]:
+        """
+        Return the names closest to the query, tolerating typos in whole names or in their start.
+
+        Args:
+            query (str): A possibly misspelled product name.
+            limit (int, optional): Maximum number of names returned. Defaults to 5.
+            max_distance (Optional[int], optional): Largest edit distance accepted. Defaults to a third of the query length, at least 1.
+
+        Returns:
+            List[str]: The matching names, closest first.
+        """
+        query = query.lower().strip()
+        if not query:
+            return []
+        if max_distance is None:
+            max_distance = max(1, len(query) // 3)
+
+        postings = [
+            positions
+            for positions in map(self._postings.get, set(trigrams(query)))
+            if positions is not None and len(positions) <= self.max_postings
+        ]
+        if not postings:
+            # Every trigram of the query is too common to walk; names starting with it are the best cheap guess.
+            return self.prefix(query, limit)
+
+        shared = Counter()
+        for positions in postings:
+            shared.update(positions)
+
+        ranked = list()
+        for position, overlap in heapq.nlargest(self.max_candidates, shared.items(), key=lambda item: item[1]):
+            name = self.names[position]
+            lowered = name.lower()
+            # A misspelled start of a name ranks after misspellings of whole names.
+            is_partial = False
+            distance = edit_distance(query, lowered, max_distance)
+            if distance > max_distance:
+                is_partial = True
+                distance = edit_distance(query, lowered[: len(query)], max_distance)
+            if distance <= max_distance:
+                ranked.append((is_partial, distance, -overlap, name))
+
+        return [name for *_, name in sorted(ranked)[:limit]]
+
+    def suggest(self, query: str, limit: int = 5) -> List[str]:
+        """
+        Return ranked suggestions for a query: names starting with it first, then close misspellings.
+
+        Args:
+            query (str): What the user typed.
+            limit (int, optional): Maximum number of names returned. Defaults to 5.
+
+        Returns:
+            List[str]: The suggested names, best first.
+        """
+        suggestions = self.prefix(query, limit)
+        for name in self.fuzzy(query, limit):
+            if len(suggestions) >= limit:
+                break
+            if name not in suggestions:
+                suggestions.append(name)
+
+        return suggestions
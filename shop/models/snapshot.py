@@ -0,0 +1,122 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, NoReturn, Optional
+from config.log_config import config_logging
+
+logger = config_logging()
+
+# Bumped whenever the layout of Product, CatalogIndex or ColumnarIndex changes.
+SNAPSHOT_VERSION = 3
+
+
+def source_key(csv_path: Path, with_hash: bool = True) -> Dict[str, Any]:
+    """Return the mtime, size and (optionally) SHA-256 of the products file."""
+    stat = csv_path.stat()
+    key = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": None}
+
+    if with_hash:
+        digest = hashlib.sha256()
+        with csv_path.open("rb") as csv_file:
+            for block in iter(lambda: csv_file.read(1024 * 1024), b""):
+                digest.update(block)
+        key["sha256"] = digest.hexdigest()
+
+    return key
+
+
+class CatalogSnapshot:
+    """
+    A binary cache of a loaded catalog index, next to the products file it was built from.
+
+    The snapshot is a pickle of the index and its ingestion report, stamped with
+    a format version, the storage kind, and the mtime, size and SHA-256 of the
+    products file. It is used when the stamp matches: the mtime and size are
+    checked first, and the file is only hashed when they differ (e.g. after a
+    checkout that rewrote the file with the same content).
+
+    The snapshot is a local cache written by this application, so it is trusted
+    like the products file itself.
+
+    Attributes:
+        path (Path): The snapshot file.
+        csv_path (Path): The products file the snapshot was built from.
+    """
+
+    def __init__(self, path: Path, csv_path: Path) -> NoReturn:
+        """
+        Initializes the snapshot of the given products file.
+
+        Args:
+            path (Path): The snapshot file.
+            csv_path (Path): The products file the snapshot is built from.
+        """
+        self.path = path
+        self.csv_path = csv_path
+
+    def load(self, storage: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the snapshot if it is up to date with the products file.
+
+        Args:
+            storage (str): The storage kind of the catalog, "objects" or "columnar".
+
+        Returns:
+            Optional[Dict[str, Any]]: The "index" and "report" of the snapshot, or None if it is missing or stale.
+        """
+        try:
+            with self.path.open("rb") as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+        except FileNotFoundError:
+            return None
+        except Exception as error:
+            logger.error(f"Catalog snapshot {self.path.name} is unreadable: {error}")
+            return None
+
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("storage") != storage:
+            return None
+
+        source = snapshot["source"]
+        current = source_key(self.csv_path, with_hash=False)
+        if (current["mtime_ns"], current["size"]) != (source["mtime_ns"], source["size"]):
+            if current["size"] != source["size"]:
+                return None
+            current = source_key(self.csv_path)
+            if current["sha256"] != source["sha256"]:
+                return None
+            logger.debug(f"{self.csv_path.name} was touched but its content is unchanged.")
+
+        logger.debug(f"Catalog has been loaded from snapshot {self.path.name}.")
+        return snapshot
+
+    def write(
+        self, storage: str, index: Any, report: Any, source: Dict[str, Any]
+    ) -> NoReturn:
+        """
+        Write the index and report to the snapshot file, atomically.
+
+        Args:
+            storage (str): The storage kind of the catalog, "objects" or "columnar".
+            index (CatalogIndex | ColumnarIndex): The loaded index.
+            report (IngestionReport): The report of the load.
+            source (Dict[str, Any]): The source_key of the products file, taken before it was read.
+        """
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "storage": storage,
+            "source": source,
+            "index": index,
+            "report": report,
+        }
+
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with temporary.open("wb") as snapshot_file:
+                pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path)
+        except OSError as error:
+            logger.error(f"Catalog snapshot {self.path.name} could not be written: {error}")
+            temporary.unlink(missing_ok=True)
+        else:
+            logger.debug(f"Catalog snapshot {self.path.name} has been written.")
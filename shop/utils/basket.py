@@ -1,90 +1,353 @@
-from typing import NoReturn, List, Union, Type
-from shop.utils.decorators import apply_tax
+import functools
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, NoReturn, List, Optional, Tuple
+from shop.utils.ordering import ItemOrder
+from shop.utils.orders import LineResult, OrderLine
 from shop.models.products import Product
-from shop.helpers.exceptions import ItemDoesNotExistError, WrongOrderError
+from shop.models.pricing import PricingEngine, Quote, pricing_engine
+from shop.models.inventory import Inventory, inventory
+from shop.helpers.exceptions import (
+    BasketTotalsError,
+    ItemDoesNotExistError,
+    OutOfStockError,
+    WrongOrderError,
+)
+from config.app_config import get_config
 from config.log_config import config_logging
 
 logger = config_logging()
 
+basket_config = get_config("shop.basket")
+
+
+def _locked(method: Callable) -> Callable:
+    """Run a method of a basket while holding its lock."""
+    @functools.wraps(method)
+    def wrapped_method(basket, *args, **kwargs):
+        with basket.lock:
+            return method(basket, *args, **kwargs)
+
+    return wrapped_method
+
 
 class Basket:
     """
     The Basket class represents a user's shopping basket.
 
+    Every signed-in user has their own basket, handed out by the session
+    manager of shop.utils.sessions.
+
+    The subtotal, the discounts and the net amount of each tax rate are kept
+    up to date on every change of units, by repricing only the changed line,
+    so a quote is built from them whatever the size of the basket.
+
+    Every unit in the basket is reserved in the inventory: units are reserved
+    when added, released when removed, and committed as sold at checkout.
+
+    Changes of lines, units and order are reported to `on_change`, e.g. so the
+    session manager can persist the basket. Changes and serialisation hold the
+    lock of the basket, so it can be saved from another thread.
+
+    Class Attributes:
+        verify_totals (bool): Cross-check the running totals against a full recomputation after every change.
+        pricing (PricingEngine): The engine baskets are priced with.
+        inventory (Inventory): The stock units are reserved from.
+
     Attributes:
-        _instance (Union[None, Type[Basket]]): Singleton instance of the Basket class.
-        basket (list): List to store the products in the basket.
+        owner (Optional[str]): The username of the user the basket belongs to.
+        is_premium (bool): Whether the owner has a premium account.
+        basket (Dict[str, dict]): The lines of the basket keyed by product name.
+        order (ItemOrder): The product names of the basket, in the order they are shown.
+        subtotal_cents (int): The price of every unit in the basket before discounts and tax, in cents.
+        discount_cents (int): The discounts of every line of the basket, in cents.
+        net_cents_by_tax_rate (Dict[Decimal, int]): The net amount of the lines of each tax rate, in cents.
+        on_change (Optional[Callable[[Basket], None]]): Called after every change of the basket.
+        lock (threading.RLock): Held while the basket is changed or serialised.
     """
 
-    _instance: Union[None, Type["Basket"]] = None
-    basket = list()
+    verify_totals: bool = basket_config.get("verify_totals", False)
+    pricing: PricingEngine = pricing_engine
+    inventory: Inventory = inventory
 
-    def __new__(cls, *args, **kwargs) -> Type["Basket"]:
-        if not cls._instance:
-            cls._instance = super().__new__(cls, *args, **kwargs)
-        return cls._instance
+    def __init__(self, owner: Optional[str] = None, is_premium: bool = False) -> NoReturn:
+        """
+        Initializes an empty basket.
 
-    def add_items(self, item_names: List[str]) -> NoReturn:
-        """Add items to the basket.
+        Args:
+            owner (Optional[str], optional): The username of the user the basket belongs to.
+            is_premium (bool, optional): Whether the owner has a premium account. Defaults to False.
+        """
+        self.owner = owner
+        self.is_premium = is_premium
+        self.basket: Dict[str, dict] = dict()
+        self.order = ItemOrder()
+        self.subtotal_cents = 0
+        self.discount_cents = 0
+        self.net_cents_by_tax_rate: Dict[Decimal, int] = defaultdict(int)
+        self.on_change: Optional[Callable[["Basket"], None]] = None
+        self.lock = threading.RLock()
+        # Whether the running totals include the premium discount.
+        self._totals_premium = is_premium
+
+    def __len__(self) -> int:
+        """Return the number of distinct products in the basket."""
+        return len(self.basket)
+
+    @_locked
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a copy of the lines of the basket, in order, as a JSON-serializable dict."""
+        return {"lines": [dict(item) for item in self.items()]}
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], owner: Optional[str] = None, is_premium: bool = False
+    ) -> "Basket":
+        """
+        Rebuild a basket from the dict returned by to_dict.
 
-        Parameters:
-            item_names (List[str]): A list of product names to be added to the basket.
+        Args:
+            data (Dict[str, Any]): The lines of the basket.
+            owner (Optional[str], optional): The username of the user the basket belongs to.
+            is_premium (bool, optional): Whether the owner has a premium account. Defaults to False.
 
         Returns:
-            NoReturn: This method does not return anything.
+            Basket: The rebuilt basket.
+        """
+        basket = cls(owner, is_premium)
+        for item in data["lines"]:
+            basket.basket[item["name"]] = dict(item)
+            basket.order.append(item["name"])
+        basket.recompute_totals()
+        return basket
+
+    @_locked
+    def quote(self) -> Quote:
         """
-        new_products = Product.get_item(item_names)
+        Price the basket from its running totals.
 
-        for product in new_products:
-            product = product._asdict()
-            is_found = False
+        Returns:
+            Quote: The subtotal, discounts, tax and total of the basket, in dollars.
+        """
+        if self._totals_premium != self.is_premium:
+            self.recompute_totals()
+        return self.pricing.totals(self.subtotal_cents, self.discount_cents, self.net_cents_by_tax_rate)
+
+    def _add_line_totals(self, item: dict, sign: int) -> NoReturn:
+        """Add the prices of a line to the running totals, or subtract them if sign is -1."""
+        amount, discount, tax_rate = self.pricing.price_line(item, self._totals_premium)
+        self.subtotal_cents += sign * amount
+        self.discount_cents += sign * discount
+        net_cents = self.net_cents_by_tax_rate[tax_rate] + sign * (amount - discount)
+        if net_cents:
+            self.net_cents_by_tax_rate[tax_rate] = net_cents
+        else:
+            del self.net_cents_by_tax_rate[tax_rate]
+
+    @_locked
+    def recompute_totals(self) -> NoReturn:
+        """Recompute the running totals from every line, e.g. after the basket is restored or its owner turns premium."""
+        self._totals_premium = self.is_premium
+        self.subtotal_cents = self.discount_cents = 0
+        self.net_cents_by_tax_rate.clear()
+        for item in self.basket.values():
+            self._add_line_totals(item, 1)
+
+    def check_totals(self) -> NoReturn:
+        """
+        Compare the quote of the running totals with a full recomputation.
+
+        Raises:
+            BasketTotalsError: If they differ.
+        """
+        quote = self.quote()
+        expected = self.pricing.quote(self.basket.values(), self.is_premium)
+        if quote != expected:
+            logger.critical(
+                f"Running totals {quote} of {self.owner}'s basket differ from {expected}."
+            )
+            raise BasketTotalsError(
+                f"Running totals {quote} differ from the recomputed {expected}."
+            )
 
-            for item in self.basket:
-                if product["name"] == item["name"]:
-                    is_found = True
-                    item["unit"] += 1
+    def _change_units(self, item: dict, units: int) -> NoReturn:
+        """Add units to a line, or remove them if negative, and reprice the line in the running totals."""
+        self._add_line_totals(item, -1)
+        item["unit"] += units
+        self._add_line_totals(item, 1)
+
+    def _changed(self) -> NoReturn:
+        """Report a change of the basket to on_change."""
+        if self.on_change is not None:
+            self.on_change(self)
+
+    @property
+    def stock_owner(self) -> str:
+        """Get the key the units of the basket are reserved under in the inventory."""
+        if self.owner is None:
+            return f"basket-{id(self)}"
+        return self.owner.lower()
+
+    @_locked
+    def reserve_stock(self) -> List[str]:
+        """
+        Reserve every unit of the basket, e.g. after it has been restored.
 
-                    logger.debug(
-                        f"{item['name']} unit has been increased by 1 in user's basket."
-                    )
-                    print(f"{item['name']} unit has been increased by 1.")
+        Units still reserved under the owner of the basket, e.g. by a process
+        that crashed before releasing them, are released first, so the
+        reservation ends up matching the units of the basket instead of adding
+        to them. Lines are then reserved in order. A line whose units are no
+        longer all in stock keeps the units that are, and is deleted if none is.
 
-            if not is_found:
-                product["unit"] = 1
-                self.basket.append(product)
+        Returns:
+            List[str]: The names of the lines that lost units.
+        """
+        self.release_stock()
+
+        shortened = list()
+        for item in list(self.items()):
+            try:
+                self.inventory.reserve(self.stock_owner, item, item["unit"])
+                continue
+            except OutOfStockError:
+                shortened.append(item["name"])
+
+            units = min(item["unit"], self.inventory.available(item))
+            if units:
+                try:
+                    self.inventory.reserve(self.stock_owner, item, units)
+                except OutOfStockError:
+                    units = 0
+            self._change_units(item, units - item["unit"])
+            if not units:
+                del self.basket[item["name"]]
+                self.order.remove(item["name"])
+
+        if shortened:
+            logger.info(f"{', '.join(shortened)} of {self.owner}'s basket are no longer all in stock.")
+            self._changed()
+        return shortened
+
+    def release_stock(self) -> NoReturn:
+        """Give every unit reserved by the basket back to the stock."""
+        self.inventory.release_all(self.stock_owner)
+
+    def commit_stock(self) -> NoReturn:
+        """Mark every unit reserved by the basket as sold, at checkout."""
+        self.inventory.commit(self.stock_owner)
+
+    @_locked
+    def add_quantities(self, lines: List[OrderLine]) -> List[LineResult]:
+        """
+        Add several products with their quantities in one update of the basket.
+
+        The names are looked up in the catalog in one batch. The units of each
+        line are reserved in the inventory all at once, so a line is either
+        added in full or not at all. Lines that fail don't stop the others.
 
-                logger.debug(f"{product['name']} has been added to user's basket.")
-                print(f"{product['name']} has been added to your basket!")
+        Parameters:
+            lines (List[OrderLine]): The product names and units to add, e.g. from parse_order.
 
-    def remove_items(self, item_names: List[str]) -> NoReturn:
+        Returns:
+            List[LineResult]: The outcome of every line, in order.
+        """
+        products = Product.find_items(name for name, _ in lines)
+        results = list()
+
+        for name, units in lines:
+            product = products.get(name)
+            if product is None:
+                message = f"{name} does not exist in the products."
+                suggestions = Product.catalog.search.suggest(name, limit=3)
+                if suggestions:
+                    message += f" Did you mean: {', '.join(suggestions)}?"
+                results.append(LineResult(name, units, 0, False, message))
+                continue
+
+            item = self.basket.get(name)
+            try:
+                self.inventory.reserve(self.stock_owner, item or product._asdict(), units)
+            except OutOfStockError as error:
+                results.append(LineResult(name, units, 0, False, str(error)))
+                continue
+
+            if item is None:
+                item = product._asdict()
+                item["unit"] = 0
+                self.basket[name] = item
+                self.order.append(name)
+                message = f"{name} x{units} has been added to your basket!"
+            else:
+                message = f"{name} unit has been increased by {units}."
+            self._change_units(item, units)
+            results.append(LineResult(name, units, units, True, message))
+
+        logger.debug(f"{sum(result.applied for result in results)} units have been added to user's basket in bulk.")
+        if self.verify_totals:
+            self.check_totals()
+        if any(result.applied for result in results):
+            self._changed()
+
+        return results
+
+    @_locked
+    def remove_quantities(self, lines: List[OrderLine]) -> List[LineResult]:
         """
-        Remove items from the basket.
+        Remove several products with their quantities in one update of the basket.
+
+        A line removing at least as many units as the basket holds deletes the
+        product from the basket, and counts as fully applied. Removed units are
+        released to the inventory.
 
         Parameters:
-            item_names (List[str]): A list of product names to be removed from the basket.
+            lines (List[OrderLine]): The product names and units to remove, e.g. from parse_order.
+
+        Returns:
+            List[LineResult]: The outcome of every line, in order.
+        """
+        results = list()
+
+        for name, units in lines:
+            item = self.basket.get(name)
+            if item is None:
+                results.append(LineResult(name, units, 0, False, f"{name} is not in your basket."))
+                continue
+
+            removed = min(units, item["unit"])
+            self.inventory.release(self.stock_owner, item, removed)
+            self._change_units(item, -removed)
+
+            if item["unit"] > 0:
+                message = f"{name} unit has been decreased by {removed}."
+            else:
+                del self.basket[name]
+                self.order.remove(name)
+                message = f"{name} has been deleted from your basket!"
+            results.append(LineResult(name, units, removed, True, message))
+
+        if self.verify_totals:
+            self.check_totals()
+        if any(result.applied for result in results):
+            self._changed()
+
+        return results
+
+    def items(self) -> Iterator[dict]:
+        """Iterate over the lines of the basket, in the order they are shown."""
+        for name in self.order:
+            yield self.basket[name]
+
+    def position(self, item_name: str) -> int:
+        """
+        Return the place of an item in the basket (1-based index).
 
         Raises:
-            ItemDoesNotExistError: If one or more item names do not exist in the basket.
-            WrongOrderError: If the new_index provided is out of the valid range.
+            ItemDoesNotExistError: If the specified item name does not exist in the basket.
         """
-        item_names = [
-            name
-            for name in item_names
-            if any(name == item_name.get("name") for item_name in self.basket)
-        ]
-        for item in self.basket:
-            if item["name"] in item_names:
-                if item["unit"] > 1:
-                    item["unit"] -= 1
-                    item_names.remove(item["name"])
-                    print(f"{item['name']} unit has been decreased by 1.")
-
-        self.basket = list(
-            filter(lambda item: item["name"] not in item_names, self.basket)
-        )
-
-        for item in item_names:
-            print(f"{item} has been deleted from your basket!")
+        if item_name not in self.basket:
+            raise ItemDoesNotExistError(f"{item_name} does not exist in your basket.")
+        return self.order.position(item_name) + 1
 
     def change_index(
         self, item_name: str, new_index: int
@@ -100,31 +363,50 @@ class Basket:
             ItemDoesNotExistError: If the specified item name does not exist in the basket.
             WrongOrderError: If the new_index provided is out of the valid range.
         """
-        if (new_index > len(self.basket)) or (new_index <= 0):
-            logger.info(
-                f"The considered order({new_index}) does not exist in user's basket."
-            )
-            raise WrongOrderError(
-                f"The considered order({new_index}) does not exist in basket."
-            )
+        self.change_indexes([(item_name, new_index)])
+
+    @_locked
+    def change_indexes(
+        self, moves: List[Tuple[str, int]]
+    ) -> NoReturn | ItemDoesNotExistError | WrongOrderError:
+        """
+        Move several items of the basket, one after the other.
 
-        for item in self.basket:
-            if item["name"] == item_name:
-                self.basket.remove(item)
-                self.basket.insert(new_index - 1, item)
+        Every move is checked before any item is moved, so either all of them
+        are applied or none is. Each move costs O(log n).
 
-                print(f"{item['name']} has been moved to the {new_index}rd place!")
-                logger.debug(
-                    f"{item['name']} has been moved to the {new_index}rd place in user's basket."
+        Parameters:
+            moves (List[Tuple[str, int]]): The name of each item to be moved and its new index (1-based index), in the order they are applied.
+
+        Raises:
+            ItemDoesNotExistError: If one of the item names does not exist in the basket.
+            WrongOrderError: If one of the new indexes is out of the valid range.
+        """
+        for item_name, new_index in moves:
+            if (new_index > len(self.basket)) or (new_index <= 0):
+                logger.info(
+                    f"The considered order({new_index}) does not exist in user's basket."
                 )
-                break
-        else:
-            logger.info(
-                f"{item_name} was not in customer's basket while changing index"
-            )
-            raise ItemDoesNotExistError(
-                f"{item_name} does not exist in your basket(Pay attention to the spelling of words)."
+                raise WrongOrderError(
+                    f"The considered order({new_index}) does not exist in basket."
+                )
+
+            if item_name not in self.basket:
+                logger.info(
+                    f"{item_name} was not in customer's basket while changing index"
+                )
+                raise ItemDoesNotExistError(
+                    f"{item_name} does not exist in your basket(Pay attention to the spelling of words)."
+                )
+
+        for item_name, new_index in moves:
+            self.order.move(item_name, new_index - 1)
+
+            print(f"{item_name} has been moved to the {new_index}rd place!")
+            logger.debug(
+                f"{item_name} has been moved to the {new_index}rd place in user's basket."
             )
+        self._changed()
 
     def search_item(self, item_name: str) -> str:
         """
@@ -136,10 +418,10 @@ class Basket:
         Returns:
             str: A message indicating whether the item is in the basket or not.
         """
-        message = "Your considered item is not in your basket."
-        for item in self.basket:
-            if item["name"] == item_name:
-                message = "Your considered item is in your basket."
+        if item_name in self.basket:
+            message = "Your considered item is in your basket."
+        else:
+            message = "Your considered item is not in your basket."
         logger.debug("User searched basket successfully.")
 
         return message
@@ -153,13 +435,13 @@ class Basket:
         """
         if len(self.basket) == 0:
             message = "You have no items in your basket."
-        message = f"You have {len(self.basket)} distinct product in your basket."
+        else:
+            message = f"You have {len(self.basket)} distinct product in your basket."
         message += "\nTo view more details of your basket, please enter: show"
         logger.debug("Counted successfully.")
 
         return message
 
-    @apply_tax
     def show(self) -> str:
         """
         Show the contents of the basket, including prices and categories.
@@ -170,7 +452,7 @@ class Basket:
         result = "This is your basket:"
         if len(self.basket) == 0:
             result += "\nYou have nothing in your basket! Type and Enter add for adding some products."
-        for item in self.basket:
+        for item in self.items():
             result += f"\n-{item['name']}: {item['unit']} in your basket, price: {item['price']}, category: {item['category']}."
 
         return result
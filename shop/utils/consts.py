@@ -4,6 +4,8 @@ from shop.handlers import (
     handle_search_command,
     handle_change_index,
     handle_count_command,
+    handle_browse_command,
+    handle_import_command,
 )
 
 COMMANDS = {
@@ -12,4 +14,6 @@ COMMANDS = {
     "prioritize": handle_change_index,
     "count": handle_count_command,
     "search": handle_search_command,
+    "browse": handle_browse_command,
+    "import": handle_import_command,
 }
@@ -1,9 +1,13 @@
 import os
+from decimal import Decimal, InvalidOperation
 from typing import NoReturn, List
 from config.log_config import config_logging
 
 logger = config_logging()
 
+# Highest price accepted by parse_price_cents, in cents ($1,000,000,000).
+MAX_PRICE_CENTS = 100_000_000_000
+
 
 def title_and_strip_names(names: List[str]) -> List[str]:
     """Converts all names in the list to title case and removes whitespaces from the the start and end of the names and returns the updated list."""
@@ -13,11 +17,48 @@ def title_and_strip_names(names: List[str]) -> List[str]:
     return names
 
 
+def parse_price_cents(price: str) -> int:
+    """
+    Parse a price text such as "$1,299.99" into integer cents.
+
+    Raises:
+        TypeError: If the price is not a valid amount, e.g. negative, not finite or above MAX_PRICE_CENTS.
+    """
+    try:
+        amount = Decimal(price.replace("$", "").replace(",", "").strip())
+    except (AttributeError, InvalidOperation):
+        raise TypeError(f"Invalid price: {price!r}")
+
+    if not amount.is_finite() or not 0 <= amount * 100 <= MAX_PRICE_CENTS:
+        raise TypeError(f"Invalid price: {price!r}")
+
+    return int((amount * 100).to_integral_value())
+
+
+def format_price(price_cents: int) -> str:
+    """Format integer cents as a price text such as "$999" or "$12.50"."""
+    dollars, cents = divmod(price_cents, 100)
+    if cents:
+        return f"${dollars}.{cents:02d}"
+    return f"${dollars}"
+
+
 def show_divider() -> str:
     """Return a string representing a divider."""
     return "--------"
 
 
+def show_price(quote) -> str:
+    """Return the discounts, tax and final price of a basket quote."""
+    message = ""
+    if quote.discount:
+        message += "\nSubtotal: {:.2f}$, discounts: -{:.2f}$".format(quote.subtotal, quote.discount)
+    message += "\nTax: {:.2f}$".format(quote.tax)
+    message += "\nHere is your final price after tax: {:.2f}$".format(quote.total)
+
+    return message
+
+
 def show_help() -> str:
     """
     Provide a help message with instructions for using the shopping store.
@@ -27,17 +68,19 @@ def show_help() -> str:
     """
     message = """
 For viewing the products of the store please enter: products
+For browsing products by category, price and stock please enter: browse
 For adding item(s) please enter: add
+For adding a whole order from a .csv or .json file please enter: import
 For removing item(s) please enter: remove
 For searching the existence of your item please enter: search
-For changing the priority of an item please enter: prioritize
+For changing the priority of item(s) please enter: prioritize
 To see how many products you have on your basket please enter: count
 For showing your basket please enter: show
 For returning back to the last step please enter: back
 for showing this guideline again please enter: help
 For finishing and quitting our store please enter: quit
 
-ATTENTION: PUT ',' BETWEEN ITEMS WHEN ADDING OR REMOVING.
+ATTENTION: PUT ',' BETWEEN ITEMS WHEN ADDING OR REMOVING, AND ' x' BEFORE A QUANTITY, E.G. GAMING MOUSE x20.
 """
     logger.debug("User viewed help successfully.")
 
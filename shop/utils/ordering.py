@@ -0,0 +1,191 @@
+import random
+from typing import Dict, Hashable, Iterator, NoReturn, Optional, Tuple
+
+
+class _Node:
+    """A node of an ItemOrder, holding one key and the size of its subtree."""
+
+    __slots__ = ("key", "priority", "size", "left", "right", "parent")
+
+    def __init__(self, key: Hashable) -> NoReturn:
+        self.key = key
+        self.priority = random.random()
+        self.size = 1
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.parent: Optional["_Node"] = None
+
+
+def _size(node: Optional[_Node]) -> int:
+    """Return the size of a subtree, 0 for an empty one."""
+    return node.size if node is not None else 0
+
+
+def _update(node: _Node) -> NoReturn:
+    """Recompute the size of a node and point its children back to it."""
+    node.size = 1 + _size(node.left) + _size(node.right)
+    if node.left is not None:
+        node.left.parent = node
+    if node.right is not None:
+        node.right.parent = node
+
+
+def _split(node: Optional[_Node], count: int) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split a subtree into its first `count` keys and the rest. The returned roots have no parent."""
+    if node is None:
+        return None, None
+
+    if _size(node.left) >= count:
+        first, rest = _split(node.left, count)
+        node.left = rest
+        _update(node)
+        node.parent = None
+        return first, node
+
+    first, rest = _split(node.right, count - _size(node.left) - 1)
+    node.right = first
+    _update(node)
+    node.parent = None
+    return node, rest
+
+
+def _merge(first: Optional[_Node], second: Optional[_Node]) -> Optional[_Node]:
+    """Concatenate two subtrees, every key of the first one coming before the second one."""
+    if first is None:
+        return second
+    if second is None:
+        return first
+
+    if first.priority > second.priority:
+        first.right = _merge(first.right, second)
+        _update(first)
+        first.parent = None
+        return first
+
+    second.left = _merge(first, second.left)
+    _update(second)
+    second.parent = None
+    return second
+
+
+class ItemOrder:
+    """
+    An ordered list of distinct keys with logarithmic moves and position queries.
+
+    The keys are kept in a treap ordered by position: every node knows the size
+    of its subtree and its parent, and a dict maps each key to its node. Append,
+    remove, move-to-position and position lookups cost O(log n) on average,
+    instead of the O(n) scans, removals and insertions of a list.
+
+    Positions are 0-based.
+    """
+
+    def __init__(self) -> NoReturn:
+        """Initializes an empty order."""
+        self._root: Optional[_Node] = None
+        self._nodes: Dict[Hashable, _Node] = dict()
+
+    def __len__(self) -> int:
+        """Return the number of keys."""
+        return len(self._nodes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return True if the key is in the order."""
+        return key in self._nodes
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Iterate over the keys, in order."""
+        stack = list()
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.key
+            node = node.right
+
+    def position(self, key: Hashable) -> int:
+        """
+        Return the position of a key.
+
+        Raises:
+            KeyError: If the key is not in the order.
+        """
+        node = self._nodes[key]
+        position = _size(node.left)
+        while node.parent is not None:
+            if node is node.parent.right:
+                position += _size(node.parent.left) + 1
+            node = node.parent
+        return position
+
+    def at(self, position: int) -> Hashable:
+        """
+        Return the key at a position.
+
+        Raises:
+            IndexError: If the position is out of range.
+        """
+        if not 0 <= position < len(self):
+            raise IndexError("order position out of range")
+
+        node = self._root
+        while True:
+            left = _size(node.left)
+            if position < left:
+                node = node.left
+            elif position == left:
+                return node.key
+            else:
+                position -= left + 1
+                node = node.right
+
+    def insert(self, key: Hashable, position: Optional[int] = None) -> NoReturn:
+        """
+        Insert a new key at a position, at the end by default.
+
+        Raises:
+            KeyError: If the key is already in the order.
+        """
+        if key in self._nodes:
+            raise KeyError(key)
+        if position is None:
+            position = len(self)
+
+        node = self._nodes[key] = _Node(key)
+        first, rest = _split(self._root, position)
+        self._root = _merge(_merge(first, node), rest)
+
+    def append(self, key: Hashable) -> NoReturn:
+        """Insert a new key at the end."""
+        self.insert(key)
+
+    def remove(self, key: Hashable) -> NoReturn:
+        """
+        Remove a key.
+
+        Raises:
+            KeyError: If the key is not in the order.
+        """
+        position = self.position(key)
+        del self._nodes[key]
+
+        first, rest = _split(self._root, position)
+        _, rest = _split(rest, 1)
+        self._root = _merge(first, rest)
+
+    def move(self, key: Hashable, position: int) -> NoReturn:
+        """
+        Move a key to a position, shifting the keys in between.
+
+        Raises:
+            KeyError: If the key is not in the order.
+        """
+        self.remove(key)
+        self.insert(key, position)
+
+    def clear(self) -> NoReturn:
+        """Remove every key."""
+        self._root = None
+        self._nodes.clear()
@@ -0,0 +1,135 @@
+import csv
+import json
+import re
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple
+from shop.helpers.exceptions import OrderFileError
+from shop.utils.funcs import title_and_strip_names
+
+# An item name followed by a quantity, such as "Gaming Mouse x20".
+QUANTITY_PATTERN = re.compile(r"^(?P<name>.+?)\s+[x×]\s*(?P<units>\d+)$", re.IGNORECASE)
+
+# A product name with the units of it to add or remove.
+OrderLine: NamedTuple = namedtuple("OrderLine", ["name", "units"])
+
+# The outcome of an order line: the units requested, the units applied, whether the line was fully
+# applied, and a message for the user. A removal that deletes the whole product is fully applied even
+# if fewer units than requested were in the basket.
+LineResult: NamedTuple = namedtuple("LineResult", ["name", "requested", "applied", "complete", "message"])
+
+
+def parse_order_line(text: str) -> OrderLine:
+    """
+    Parse an item such as "Gaming Mouse x20" into an order line. Items without a quantity have 1 unit.
+
+    Raises:
+        ValueError: If the quantity is 0.
+    """
+    text = text.strip()
+    match = QUANTITY_PATTERN.match(text)
+    if match is None:
+        return OrderLine(text, 1)
+
+    units = int(match["units"])
+    if units < 1:
+        raise ValueError(f"The quantity of {match['name']} must be at least 1.")
+    return OrderLine(match["name"].strip(), units)
+
+
+def merge_order_lines(lines: Iterable[OrderLine]) -> List[OrderLine]:
+    """Sum the units of lines with the same name, keeping the order of their first occurrence and dropping empty names."""
+    units: Dict[str, int] = dict()
+    for name, line_units in lines:
+        if name:
+            units[name] = units.get(name, 0) + line_units
+    return [OrderLine(name, line_units) for name, line_units in units.items()]
+
+
+def parse_order(items: Iterable[str]) -> List[OrderLine]:
+    """
+    Parse the items entered by the user into merged order lines.
+
+    Args:
+        items (Iterable[str]): Items such as "Gaming Mouse x20" or "Printer", already title-cased.
+
+    Returns:
+        List[OrderLine]: One line per product, in the order they were entered.
+
+    Raises:
+        ValueError: If a quantity is 0.
+    """
+    return merge_order_lines(parse_order_line(item) for item in items)
+
+
+def _order_line(name, units, where: str) -> OrderLine:
+    """Build an order line of an order file, normalising the name like the items entered by the user."""
+    if not isinstance(name, str) or not name.strip():
+        raise OrderFileError(f"{where}: the product name is missing.")
+    try:
+        units = int(units)
+    except (TypeError, ValueError):
+        raise OrderFileError(f"{where}: the quantity of {name} is not a number.")
+    if units < 1:
+        raise OrderFileError(f"{where}: the quantity of {name} must be at least 1.")
+
+    return OrderLine(title_and_strip_names([name])[0], units)
+
+
+def read_order_file(path: Path) -> List[OrderLine]:
+    """
+    Read a whole order from a CSV or JSON file.
+
+    A CSV file has a header with a "name" column and an optional "quantity"
+    column. A JSON file is either a list of {"name": ..., "quantity": ...}
+    objects or an object mapping names to quantities. A missing quantity is 1.
+
+    Args:
+        path (Path): The order file, with a .csv or .json extension.
+
+    Returns:
+        List[OrderLine]: One line per product, in file order.
+
+    Raises:
+        OrderFileError: If the file can't be read or a line is invalid.
+    """
+    suffix = path.suffix.lower()
+    try:
+        with path.open(encoding="utf-8", newline="") as order_file:
+            if suffix == ".csv":
+                reader = csv.DictReader(order_file)
+                if reader.fieldnames is None or "name" not in reader.fieldnames:
+                    raise OrderFileError(f"{path.name} must have a header with a name column.")
+                lines = [
+                    _order_line(row["name"], row.get("quantity") or 1, f"{path.name}, line {number}")
+                    for number, row in enumerate(reader, start=2)
+                ]
+            elif suffix == ".json":
+                order = json.load(order_file)
+                if isinstance(order, dict):
+                    order = [{"name": name, "quantity": units} for name, units in order.items()]
+                if not isinstance(order, list) or not all(isinstance(line, dict) for line in order):
+                    raise OrderFileError(f"{path.name} must hold a list of order lines or an object of quantities.")
+                lines = [
+                    _order_line(line.get("name"), line.get("quantity", 1), f"{path.name}, line {number}")
+                    for number, line in enumerate(order, start=1)
+                ]
+            else:
+                raise OrderFileError(f"{path.name} is neither a .csv nor a .json file.")
+    except OSError as error:
+        raise OrderFileError(f"{path} could not be read: {error.strerror}.")
+    except (UnicodeDecodeError, json.JSONDecodeError, csv.Error) as error:
+        raise OrderFileError(f"{path.name} is not a valid order file: {error}")
+
+    return merge_order_lines(lines)
+
+
+def all_applied(results: List[LineResult]) -> bool:
+    """Return whether every order line was fully applied."""
+    return all(result.complete for result in results)
+
+
+def summarize_results(results: List[LineResult]) -> str:
+    """Return how many order lines were fully applied."""
+    applied = sum(1 for result in results if result.complete)
+    return f"{applied} of {len(results)} order lines have been applied."
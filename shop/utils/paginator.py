@@ -0,0 +1,91 @@
+from collections import namedtuple
+from typing import Iterator, NamedTuple, NoReturn, Optional, Sequence
+
+# A page of items. Cursors are offsets into the paginated sequence; a missing neighbour is None.
+Page: NamedTuple = namedtuple(
+    "Page", ["items", "number", "total_pages", "cursor", "next_cursor", "previous_cursor"]
+)
+
+
+class Paginator:
+    """
+    Splits a sequence into pages, without any terminal I/O.
+
+    Pages are fetched from a cursor, the offset of their first item. Only the
+    items of the requested page are sliced out, so paginating a catalog or a
+    lazy view never copies the whole sequence.
+
+    Attributes:
+        items (Sequence): The paginated items.
+        page_size (int): Number of items per page.
+    """
+
+    def __init__(self, items: Sequence, page_size: int = 5) -> NoReturn:
+        """
+        Initializes a paginator.
+
+        Args:
+            items (Sequence): The paginated items.
+            page_size (int, optional): Number of items per page. Defaults to 5.
+
+        Raises:
+            ValueError: If the page size is not positive.
+        """
+        if page_size < 1:
+            raise ValueError(f"Page size must be positive, got {page_size}")
+        self.items = items
+        self.page_size = page_size
+
+    @property
+    def total_pages(self) -> int:
+        """Get the number of pages. An empty sequence has a single, empty page."""
+        return max(1, -(-len(self.items) // self.page_size))
+
+    def page(self, cursor: int = 0) -> Page:
+        """
+        Get the page starting at the cursor.
+
+        Args:
+            cursor (int, optional): Offset of the first item of the page. A cursor past the end gives the last page. Defaults to 0.
+
+        Returns:
+            Page: The items of the page, its number and the cursors of its neighbours.
+        """
+        count = len(self.items)
+        cursor = max(0, cursor)
+        if cursor >= count:
+            cursor = (self.total_pages - 1) * self.page_size
+        end = cursor + self.page_size
+
+        next_cursor: Optional[int] = end if end < count else None
+        previous_cursor: Optional[int] = max(0, cursor - self.page_size) if cursor > 0 else None
+
+        return Page(
+            items=self.items[cursor:end],
+            number=cursor // self.page_size + 1,
+            total_pages=self.total_pages,
+            cursor=cursor,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+        )
+
+    def page_number(self, number: int) -> Page:
+        """
+        Get a page by its 1-based number.
+
+        Args:
+            number (int): The page number. Clamped to the valid range.
+
+        Returns:
+            Page: The page.
+        """
+        number = min(max(1, number), self.total_pages)
+        return self.page((number - 1) * self.page_size)
+
+    def __iter__(self) -> Iterator[Page]:
+        """Iterate over every page, in order."""
+        cursor: Optional[int] = 0
+        while cursor is not None:
+            page = self.page(cursor)
+            yield page
+            cursor = page.next_cursor
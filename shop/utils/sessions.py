@@ -0,0 +1,234 @@
+import atexit
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, NoReturn, Optional
+from auth.models.user import User
+from shop.models.baskets import SqliteBasketStore, WriteBehindBasketStore
+from shop.utils.basket import Basket
+from config.app_config import get_config, project_path
+from config.log_config import config_logging
+
+logger = config_logging()
+
+sessions_config = get_config("shop.sessions")
+
+
+class SessionManager:
+    """
+    Holds the basket of every signed-in user of the process.
+
+    Baskets are persisted per user: every change of a basket marks it as
+    pending in a write-behind store, which flushes it in the background, so
+    commands never wait for the disk. A basket is restored lazily, the first
+    time its user needs it after signing in.
+
+    Baskets are kept in memory from the least to the most recently used. A
+    basket that has not been used for `idle_timeout` seconds, or the least
+    recently used one once more than `max_active` baskets are in memory, is
+    evicted from memory; its changes are already pending or stored. The stock
+    reserved by an evicted basket is released, and reserved again when it is
+    restored. Eviction walks from the least recently used end, so it only
+    looks at baskets that are actually evicted. It runs on every `basket`
+    call, and every `evict_interval` seconds in a background thread, so idle
+    baskets of a quiet process are evicted and their stock released too.
+
+    A basket is restored without holding the lock of the manager, so loading
+    it and reserving its stock don't hold up the other shoppers. Restores of
+    the same user are serialised by a lock of their own, so they happen once.
+
+    A basket must be fetched with `basket` for every command rather than kept
+    around, since an idle basket may be evicted in the meantime.
+
+    Attributes:
+        store (WriteBehindBasketStore): Where baskets are persisted.
+        idle_timeout (float): Seconds after which an unused basket is evicted.
+        max_active (int): Maximum number of baskets kept in memory.
+        evict_interval (float): Seconds between two background evictions of idle baskets, or 0 to only evict on `basket` calls.
+    """
+
+    def __init__(
+        self,
+        store: WriteBehindBasketStore,
+        idle_timeout: float = 900.0,
+        max_active: int = 10000,
+        evict_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> NoReturn:
+        """
+        Initializes a session manager with no session. The eviction thread is started with the first basket.
+
+        Args:
+            store (WriteBehindBasketStore): Where baskets are persisted.
+            idle_timeout (float, optional): Seconds after which an unused basket is evicted. Defaults to 900.
+            max_active (int, optional): Maximum number of baskets kept in memory. Defaults to 10000.
+            evict_interval (float, optional): Seconds between two background evictions of idle baskets, or 0 to only evict on `basket` calls. Defaults to 60.
+            clock (Callable[[], float], optional): Returns the current time in seconds. Defaults to time.monotonic.
+        """
+        self.store = store
+        self.idle_timeout = idle_timeout
+        self.max_active = max_active
+        self.evict_interval = evict_interval
+        self._clock = clock
+        self._baskets: "OrderedDict[str, Basket]" = OrderedDict()
+        self._last_used: Dict[str, float] = dict()
+        self._lock = threading.Lock()
+        # A lock per user whose basket is being restored.
+        self._restoring: Dict[str, threading.Lock] = dict()
+        self._closed = threading.Event()
+        self._evicter: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        """Return the number of baskets in memory."""
+        return len(self._baskets)
+
+    def basket(self, user: User) -> Basket:
+        """
+        Get the basket of a user, restoring it from the store or creating it if needed.
+
+        Args:
+            user (User): A signed-in user.
+
+        Returns:
+            Basket: The basket of the user.
+        """
+        key = user.username.lower()
+        with self._lock:
+            basket = self._baskets.get(key)
+            if basket is None:
+                restoring = self._restoring.setdefault(key, threading.Lock())
+
+        if basket is None:
+            with restoring:
+                with self._lock:
+                    # Another command of the user may have restored the basket meanwhile.
+                    basket = self._baskets.get(key)
+
+                if basket is None:
+                    basket = self._restore(key, user)
+                    with self._lock:
+                        self._baskets[key] = basket
+                        self._last_used[key] = self._clock()
+                        self._start_evicter()
+
+            with self._lock:
+                self._restoring.pop(key, None)
+
+        with self._lock:
+            now = self._clock()
+            # Unless the basket has just been evicted, by a restore of another user over max_active.
+            if self._baskets.get(key) is basket:
+                self._baskets.move_to_end(key)
+                self._last_used[key] = now
+            self._evict(now)
+
+        return basket
+
+    def _restore(self, key: str, user: User) -> Basket:
+        """Load the basket of a user from the store and reserve its stock again, or create an empty one."""
+        stored_basket = self.store.load(key)
+        if stored_basket is None:
+            basket = Basket(owner=user.username, is_premium=user.is_premium)
+        else:
+            basket = Basket.from_dict(
+                stored_basket, owner=user.username, is_premium=user.is_premium
+            )
+            shortened = basket.reserve_stock()
+            if shortened:
+                print(f"Some units of {', '.join(shortened)} are no longer in stock and have been removed from your basket.")
+            logger.debug(f"Basket of {user.username} has been restored.")
+        basket.on_change = functools.partial(self._changed, key)
+        return basket
+
+    def _start_evicter(self) -> NoReturn:
+        """Start the eviction thread if it isn't running yet. Needs the lock."""
+        if self._evicter is None and self.evict_interval > 0 and not self._closed.is_set():
+            self._evicter = threading.Thread(
+                target=self._run_evictions, name="sessions-evicter", daemon=True
+            )
+            self._evicter.start()
+
+    def _changed(self, key: str, basket: Basket) -> NoReturn:
+        """Mark a changed basket as pending a flush. Its contents are only serialised when flushed."""
+        self.store.save_later(key, basket.to_dict)
+
+    def evict_idle(self) -> int:
+        """
+        Evict the idle baskets from memory.
+
+        Returns:
+            int: Number of evicted baskets.
+        """
+        with self._lock:
+            return self._evict(self._clock())
+
+    def _run_evictions(self) -> NoReturn:
+        """Evict idle baskets every evict_interval seconds until the manager is closed."""
+        while not self._closed.wait(self.evict_interval):
+            try:
+                self.evict_idle()
+            except Exception as error:
+                logger.error(f"Idle baskets could not be evicted: {error}")
+
+    def _evict(self, now: float) -> int:
+        """Evict idle baskets, and the least recently used ones above max_active. Needs the lock."""
+        evicted = 0
+        while self._baskets:
+            key, basket = next(iter(self._baskets.items()))
+            is_idle = now - self._last_used[key] > self.idle_timeout
+            if not is_idle and len(self._baskets) <= self.max_active:
+                break
+
+            del self._baskets[key]
+            del self._last_used[key]
+            basket.release_stock()
+            evicted += 1
+
+        if evicted:
+            logger.debug(f"{evicted} baskets have been evicted.")
+        return evicted
+
+    def end(self, user: User) -> NoReturn:
+        """
+        End the session of a user at checkout: the units of their basket are sold and the basket is discarded.
+
+        Args:
+            user (User): A signed-in user.
+        """
+        key = user.username.lower()
+        with self._lock:
+            basket = self._baskets.pop(key, None)
+            self._last_used.pop(key, None)
+            if basket is not None:
+                basket.on_change = None
+                basket.commit_stock()
+            self.store.delete(key)
+
+    def close(self) -> NoReturn:
+        """Stop the eviction thread, release the stock of every basket, then flush the pending baskets and close the store."""
+        self._closed.set()
+        if self._evicter is not None:
+            self._evicter.join()
+
+        with self._lock:
+            for basket in self._baskets.values():
+                basket.release_stock()
+            self._baskets.clear()
+            self._last_used.clear()
+            self.store.close()
+
+
+sessions = SessionManager(
+    WriteBehindBasketStore(
+        SqliteBasketStore(
+            project_path(sessions_config.get("store_path", "shop/models/baskets.sqlite3"))
+        ),
+        flush_interval=sessions_config.get("flush_interval", 2.0),
+        batch_size=sessions_config.get("flush_batch_size", 256),
+    ),
+    idle_timeout=sessions_config.get("idle_timeout", 900.0),
+    max_active=sessions_config.get("max_active", 10000),
+    evict_interval=sessions_config.get("evict_interval", 60.0),
+)
+atexit.register(sessions.close)
@@ -0,0 +1,50 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from shop.models.inventory import StripedInventory
+from shop.models.pricing import PricingEngine, PricingRules
+from shop.models.products import Product
+from shop.utils.basket import Basket
+from shop.utils.orders import OrderLine
+
+RULES = PricingRules(
+    tax_rates={"Printers": Decimal("0.2"), "Storage": Decimal("0.05")},
+    product_promotions={"Printer": Decimal("0.15"), "Gaming Mouse": Decimal("0.3")},
+    category_promotions={"Storage": Decimal("0.1")},
+    bulk_discounts=[(3, Decimal("0.05")), (10, Decimal("0.12"))],
+    premium_discount=Decimal("0.07"),
+)
+
+
+@pytest.fixture
+def basket_class(monkeypatch):
+    monkeypatch.setattr(Basket, "verify_totals", True)
+    monkeypatch.setattr(Basket, "pricing", PricingEngine(RULES))
+    monkeypatch.setattr(Basket, "inventory", StripedInventory())
+    return Basket
+
+
+@pytest.mark.parametrize("is_premium", [False, True])
+def test_running_totals_match_a_full_recompute(basket_class, is_premium):
+    names = [product.name for product in Product.catalog.products][:12]
+    rng = random.Random(2024)
+    basket = basket_class(f"totals-{is_premium}", is_premium)
+
+    for _ in range(300):
+        lines = {name: OrderLine(name, rng.randint(1, 12)) for name in rng.sample(names, rng.randint(1, 3))}
+        if rng.random() < 0.6:
+            basket.add_quantities(list(lines.values()))
+        else:
+            basket.remove_quantities(list(lines.values()))
+        basket.check_totals()
+
+    assert basket.quote() == Basket.pricing.quote(basket.basket.values(), is_premium)
+
+    basket.is_premium = not is_premium
+    basket.check_totals()
+
+    restored = Basket.from_dict(basket.to_dict(), basket.owner, basket.is_premium)
+    restored.check_totals()
+    assert restored.quote() == basket.quote()
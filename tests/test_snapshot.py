@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+PROJECT_DIRECTORY = Path(__file__).resolve().parents[1]
+
+WRITE_SNAPSHOT = """
+from pathlib import Path
+from shop.models.columnar import ColumnarIndex
+from shop.models.products import Product
+from shop.models.snapshot import CatalogSnapshot, source_key
+
+csv_path = Path({csv_path!r})
+index = ColumnarIndex([
+    Product(1, "Gaming Mouse", "$59", "Computer Accessories", 100),
+    Product(2, "Printer", "$129", "Printers", 80),
+    Product(3, "Wi-Fi Router", "$59", "Networking", 50),
+])
+CatalogSnapshot(Path({snapshot_path!r}), csv_path).write("columnar", index, None, source_key(csv_path))
+"""
+
+READ_SNAPSHOT = """
+from pathlib import Path
+from shop.models.snapshot import CatalogSnapshot
+
+snapshot = CatalogSnapshot(Path({snapshot_path!r}), Path({csv_path!r})).load("columnar")
+index = snapshot["index"]
+assert "Gaming Mouse" in index.by_name
+assert index.by_name.get("Printer").id == 2
+assert index.by_name["Wi-Fi Router"].price_cents == 5900
+assert index.by_id[3].name == "Wi-Fi Router"
+assert "Laptop" not in index.by_name
+"""
+
+
+def run_python(code: str, hash_seed: str) -> subprocess.CompletedProcess:
+    """Run code in a new interpreter with the given hash seed."""
+    environment = dict(os.environ, PYTHONHASHSEED=hash_seed)
+    return subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        cwd=PROJECT_DIRECTORY,
+        env=environment,
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_columnar_snapshot_is_readable_with_another_hash_seed(tmp_path):
+    csv_path = tmp_path / "products.csv"
+    csv_path.write_text("id,name,price,category,quantity\n")
+    paths = {"csv_path": str(csv_path), "snapshot_path": str(tmp_path / "products.csv.snapshot")}
+
+    written = run_python(WRITE_SNAPSHOT.format(**paths), hash_seed="1")
+    assert written.returncode == 0, written.stderr
+
+    read = run_python(READ_SNAPSHOT.format(**paths), hash_seed="2")
+    assert read.returncode == 0, read.stderr